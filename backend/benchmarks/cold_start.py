@@ -0,0 +1,143 @@
+import argparse
+import json
+import logging
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+APP_MODULE = "service.main"
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(output: str) -> Dict[str, Tuple[int, int]]:
+    """`-X importtime` lines into {module: (self_us, cumulative_us)}"""
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        modules[module.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_import(module: str) -> Dict[str, Tuple[int, int]]:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(process.stderr)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_request(path: str, timeout: float) -> Optional[float]:
+    """Seconds from spawning uvicorn until the first successful response"""
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            f"{APP_MODULE}:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            while time.perf_counter() - started < timeout:
+                try:
+                    if client.get(path).status_code < 400:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+        return None
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(args: argparse.Namespace) -> Dict:
+    import_runs: List[float] = []
+    modules: Dict[str, Tuple[int, int]] = {}
+    for _ in range(args.runs):
+        modules = measure_import(APP_MODULE)
+        import_runs.append(modules[APP_MODULE][1] / 1000)
+    heaviest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)
+
+    first_request_runs = [
+        measure_first_request(args.path, args.timeout) for _ in range(args.runs)
+    ]
+    failed = first_request_runs.count(None)
+    first_request_ms = [run * 1000 for run in first_request_runs if run is not None]
+
+    report = {
+        "import_ms": round(statistics.median(import_runs), 3),
+        "first_request_ms": (
+            round(statistics.median(first_request_ms), 3) if first_request_ms else None
+        ),
+        "first_request_failures": failed,
+        "heaviest_imports": [
+            {"module": module, "self_ms": self_us / 1000, "cumulative_ms": cum / 1000}
+            for module, (self_us, cum) in heaviest[: args.top]
+        ],
+        "budget": {
+            "import_ms": args.import_budget_ms,
+            "first_request_ms": args.first_request_budget_ms,
+        },
+    }
+    return report
+
+
+def over_budget(report: Dict) -> List[str]:
+    exceeded = []
+    for key, budget in report["budget"].items():
+        if budget is None:
+            continue
+        value = report[key]
+        if value is None or value > budget:
+            exceeded.append(f"{key}: {value} > {budget}")
+    return exceeded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure API cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/docs", help="First request path")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--import-budget-ms", type=float)
+    parser.add_argument("--first-request-budget-ms", type=float)
+    parser.add_argument("--output", help="Write JSON report to file")
+    args = parser.parse_args()
+    report = main(args)
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report_json)
+    print(report_json)
+    exceeded = over_budget(report)
+    if exceeded:
+        logger.error(f"Cold start budget exceeded: {', '.join(exceeded)}")
+        sys.exit(1)
@@ -0,0 +1,47 @@
+import argparse
+import json
+import sys
+from typing import Dict, List
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Return human readable regressions of current report against baseline"""
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        result = current["scenarios"].get(name)
+        if not result:
+            continue
+        for metric in METRICS:
+            if not base.get(metric) or result.get(metric) is None:
+                continue
+            change = (result[metric] - base[metric]) / base[metric]
+            if change > threshold:
+                regressions.append(
+                    f"{name}.{metric}: {base[metric]} -> {result[metric]} "
+                    f"(+{change:.1%})"
+                )
+        if base.get("throughput_rps") and result.get("throughput_rps") is not None:
+            change = (base["throughput_rps"] - result["throughput_rps"]) / base[
+                "throughput_rps"
+            ]
+            if change > threshold:
+                regressions.append(
+                    f"{name}.throughput_rps: {base['throughput_rps']} -> "
+                    f"{result['throughput_rps']} (-{change:.1%})"
+                )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+    with open(args.baseline) as baseline, open(args.current) as current:
+        regressions = compare(json.load(baseline), json.load(current), args.threshold)
+    for regression in regressions:
+        print(regression)
+    sys.exit(1 if regressions else 0)
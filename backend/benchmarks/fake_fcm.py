@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import json
+import random
+from collections import Counter
+from typing import Any, Dict
+
+import rsa
+import uvicorn
+from fastapi import FastAPI, Form, Header, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Tokens with this prefix are answered with UNREGISTERED
+INVALID_TOKEN_PREFIX = "invalid-"
+ACCESS_TOKEN = "fake-access-token"
+PROJECT_ID = "fake-project"
+
+
+class Send(BaseModel):
+    message: Dict[str, Any]
+
+
+def fcm_error(status_code: int, status: str, error_code: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "error": {
+                "code": status_code,
+                "status": status,
+                "details": [
+                    {
+                        "@type": "type.googleapis.com/google.firebase.fcm.v1.FcmError",
+                        "errorCode": error_code,
+                    }
+                ],
+            }
+        },
+    )
+
+
+def fake_credentials(base_url: str) -> Dict[str, str]:
+    """Service account key for the fake server, the key is never verified"""
+    _, private_key = rsa.newkeys(1024)
+    return {
+        "type": "service_account",
+        "project_id": PROJECT_ID,
+        "client_email": f"push@{PROJECT_ID}.iam.gserviceaccount.com",
+        "private_key": private_key.save_pkcs1().decode(),
+        "token_uri": f"{base_url}/token",
+    }
+
+
+def create_app(
+    latency_ms: float = 20,
+    error_ratio: float = 0.0,
+    seed: int = 42,
+) -> FastAPI:
+    """Local stand-in of the FCM HTTP v1 send endpoint and the OAuth2
+    token endpoint. `error_ratio` of sends fail with 503"""
+    app = FastAPI()
+    rnd = random.Random(seed)
+    stats: Counter = Counter()
+
+    @app.post("/token")
+    async def token(grant_type: str = Form(), assertion: str = Form()):
+        stats["tokens_issued"] += 1
+        return {"access_token": ACCESS_TOKEN, "expires_in": 3600}
+
+    @app.post("/v1/projects/{project_id}/messages:send")
+    async def send(project_id: str, body: Send, authorization: str = Header("")):
+        if authorization != f"Bearer {ACCESS_TOKEN}":
+            raise HTTPException(status_code=401)
+        stats["requests"] += 1
+        await asyncio.sleep(latency_ms / 1000)
+        if rnd.random() < error_ratio:
+            stats["errors"] += 1
+            return fcm_error(503, "UNAVAILABLE", "UNAVAILABLE")
+        token = body.message.get("token", "")
+        if token.startswith(INVALID_TOKEN_PREFIX):
+            stats["unregistered"] += 1
+            return fcm_error(404, "NOT_FOUND", "UNREGISTERED")
+        stats["delivered"] += 1
+        return {"name": f"projects/{project_id}/messages/{stats['delivered']}"}
+
+    @app.get("/stats")
+    async def get_stats():
+        return dict(stats)
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake FCM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9099)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--error-ratio", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--credentials-file",
+        help="Write service account key for FCM_CREDENTIALS_FILE to this path",
+    )
+    args = parser.parse_args()
+    if args.credentials_file:
+        with open(args.credentials_file, "w") as credentials:
+            json.dump(fake_credentials(f"http://{args.host}:{args.port}"), credentials)
+    uvicorn.run(
+        create_app(args.latency_ms, args.error_ratio, args.seed),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Dict
+
+import httpx
+
+from benchmarks.fake_fcm import (INVALID_TOKEN_PREFIX, create_app,
+                                 fake_credentials)
+from workers.push import FcmClient, notification_message
+
+logging.basicConfig(level=logging.INFO)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+async def main(args: argparse.Namespace) -> Dict:
+    """Send one notification to synthetic tokens. The fake FCM app is
+    served in process through ASGI transport unless --url is given"""
+    transport = None
+    if not args.url:
+        transport = httpx.ASGITransport(
+            app=create_app(args.latency_ms, args.error_ratio)
+        )
+    url = args.url or "http://fake-fcm"
+    invalid = int(args.tokens * args.invalid_ratio)
+    tokens = [f"{INVALID_TOKEN_PREFIX}{number}" for number in range(invalid)] + [
+        f"token-{number}" for number in range(args.tokens - invalid)
+    ]
+    async with FcmClient(
+        url=url,
+        credentials=fake_credentials(url),
+        concurrency=args.concurrency,
+        max_retries=args.max_retries,
+        retry_backoff=args.retry_backoff,
+        timeout=30,
+        transport=transport,
+    ) as client:
+        started = time.perf_counter()
+        result = await client.send_each(
+            tokens, notification_message("Benchmark", "Push benchmark")
+        )
+        elapsed = time.perf_counter() - started
+    return {
+        "tokens": args.tokens,
+        "sent": result.sent,
+        "failed": result.failed,
+        "invalid": len(result.invalid_tokens),
+        "elapsed_s": round(elapsed, 3),
+        "tokens_per_s": round(args.tokens / elapsed, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark FCM dispatcher")
+    parser.add_argument("--url", help="Fake FCM server, in-process by default")
+    parser.add_argument("--tokens", type=int, default=20_000)
+    parser.add_argument("--invalid-ratio", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--retry-backoff", type=float, default=0.05)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--error-ratio", type=float, default=0.01)
+    args = parser.parse_args()
+    report = asyncio.run(main(args))
+    logger.info(f"push: {report}")
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,179 @@
+import argparse
+import asyncio
+import json
+import logging
+import math
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.scenarios import (API_PREFIX, BENCH_PASSWORD, SCENARIOS,
+                                  BenchUser, Scenario, bench_email)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def percentile(values: List[float], percent: float) -> Optional[float]:
+    """Nearest-rank percentile of already sorted values"""
+    if not values:
+        return None
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def to_ms(value: Optional[float]) -> Optional[float]:
+    return round(value * 1000, 3) if value is not None else None
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "p50_ms": to_ms(percentile(latencies, 50)),
+        "p95_ms": to_ms(percentile(latencies, 95)),
+        "p99_ms": to_ms(percentile(latencies, 99)),
+        "mean_ms": to_ms(sum(latencies) / len(latencies)) if latencies else None,
+        "max_ms": to_ms(latencies[-1]) if latencies else None,
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else None,
+    }
+
+
+async def login_users(client: httpx.AsyncClient, users: List[BenchUser]) -> None:
+    for user in users:
+        response = await client.post(
+            f"{API_PREFIX}/auth/login",
+            data={"email": user.email, "password": user.password},
+        )
+        response.raise_for_status()
+        user.access_token = response.json()["access_token"]
+        response = await client.get(
+            f"{API_PREFIX}/category/", headers=user.headers, params={"size": 100}
+        )
+        response.raise_for_status()
+        user.category_ids = [item["id"] for item in response.json()["items"]]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    users: List[BenchUser],
+    requests: int,
+    concurrency: int,
+    rnd: random.Random,
+) -> Dict:
+    eligible = [
+        user
+        for user in users
+        if user.category_ids and (not scenario.requires or scenario.requires(user))
+    ]
+    if not eligible:
+        logger.warning(f"{scenario.name}: no eligible users, skipped")
+        return summarize([], 0, 0)
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            user = rnd.choice(eligible)
+            spec = scenario.build(user, rnd)
+            started = time.perf_counter()
+            try:
+                response = await client.request(
+                    spec.method,
+                    spec.url,
+                    headers=spec.headers,
+                    params=spec.params,
+                    json=spec.json,
+                    data=spec.data,
+                )
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            elapsed = time.perf_counter() - started
+            if response.status_code >= 400:
+                errors += 1
+                continue
+            latencies.append(elapsed)
+            if scenario.on_response:
+                scenario.on_response(user, response.json())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(latencies, errors, time.perf_counter() - started)
+    logger.info(f"{scenario.name}: {result}")
+    return result
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args: argparse.Namespace) -> Dict:
+    rnd = random.Random(args.seed)
+    users = [
+        BenchUser(email=bench_email(number), password=BENCH_PASSWORD)
+        for number in rnd.sample(range(1, args.seeded_users + 1), args.users)
+    ]
+    selected = set(args.scenario or [])
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        await login_users(client, users)
+        results = {}
+        for scenario in SCENARIOS:
+            if selected and scenario.name not in selected:
+                continue
+            results[scenario.name] = await run_scenario(
+                client, scenario, users, args.requests, args.concurrency, rnd
+            )
+    return {
+        "meta": {
+            "started_at": datetime.utcnow().isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "base_url": args.base_url,
+            "users": args.users,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "scenarios": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run API benchmarks")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--seeded-users", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenario", action="append", help="Run only given scenario")
+    parser.add_argument("--output", help="Write JSON report to file")
+    args = parser.parse_args()
+    report = asyncio.run(main(args))
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report_json)
+    print(report_json)
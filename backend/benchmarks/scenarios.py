@@ -0,0 +1,179 @@
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+API_PREFIX = "/api"
+BENCH_EMAIL_PREFIX = "bench_"
+BENCH_EMAIL_DOMAIN = "example.com"
+BENCH_PASSWORD = "benchmark-password"
+
+
+def bench_email(number: int) -> str:
+    return f"{BENCH_EMAIL_PREFIX}{number}@{BENCH_EMAIL_DOMAIN}"
+
+
+@dataclass
+class BenchUser:
+    email: str
+    password: str
+    access_token: Optional[str] = None
+    category_ids: List[int] = field(default_factory=list)
+    transaction_ids: List[int] = field(default_factory=list)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+
+@dataclass
+class RequestSpec:
+    method: str
+    url: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    params: Optional[Dict[str, Any]] = None
+    json: Optional[Dict[str, Any]] = None
+    data: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class Scenario:
+    """One benchmarked endpoint, `build` returns request for a random user"""
+
+    name: str
+    build: Callable[[BenchUser, random.Random], RequestSpec]
+    on_response: Optional[Callable[[BenchUser, Any], None]] = None
+    requires: Optional[Callable[[BenchUser], bool]] = None
+
+
+def _random_date(rnd: random.Random, days: int = 365) -> str:
+    return (date.today() - timedelta(days=rnd.randint(0, days))).isoformat()
+
+
+def _transaction_payload(rnd: random.Random) -> Dict[str, Any]:
+    return {
+        "amount": round(rnd.uniform(1, 5000), 2),
+        "date": _random_date(rnd),
+        "note": rnd.choice([None, "coffee", "groceries", "salary", "rent"]),
+    }
+
+
+def login(user: BenchUser, rnd: random.Random) -> RequestSpec:
+    return RequestSpec(
+        "POST",
+        f"{API_PREFIX}/auth/login",
+        data={"email": user.email, "password": user.password},
+    )
+
+
+def create_transaction(user: BenchUser, rnd: random.Random) -> RequestSpec:
+    return RequestSpec(
+        "POST",
+        f"{API_PREFIX}/transaction/{rnd.choice(user.category_ids)}",
+        headers=user.headers,
+        json=_transaction_payload(rnd),
+    )
+
+
+def remember_transaction(user: BenchUser, body: Any) -> None:
+    user.transaction_ids.append(body["id"])
+
+
+def update_transaction(user: BenchUser, rnd: random.Random) -> RequestSpec:
+    return RequestSpec(
+        "PUT",
+        f"{API_PREFIX}/transaction/{rnd.choice(user.transaction_ids)}",
+        headers=user.headers,
+        json=_transaction_payload(rnd),
+    )
+
+
+def categories(path: str) -> Callable[[BenchUser, random.Random], RequestSpec]:
+    def build(user: BenchUser, rnd: random.Random) -> RequestSpec:
+        return RequestSpec("GET", f"{API_PREFIX}/category{path}", headers=user.headers)
+
+    return build
+
+
+def category_by_id(user: BenchUser, rnd: random.Random) -> RequestSpec:
+    return RequestSpec(
+        "GET",
+        f"{API_PREFIX}/category/{rnd.choice(user.category_ids)}",
+        headers=user.headers,
+    )
+
+
+def category_filter(path: str) -> Callable[[BenchUser, random.Random], RequestSpec]:
+    def build(user: BenchUser, rnd: random.Random) -> RequestSpec:
+        return RequestSpec(
+            "GET",
+            f"{API_PREFIX}/category{path}",
+            headers=user.headers,
+            params={"search_type": rnd.choice(["DAY", "WEEK", "MONTH", "YEAR"])},
+        )
+
+    return build
+
+
+def transactions_by_category(user: BenchUser, rnd: random.Random) -> RequestSpec:
+    return RequestSpec(
+        "GET",
+        f"{API_PREFIX}/transaction/category/{rnd.choice(user.category_ids)}",
+        headers=user.headers,
+    )
+
+
+def transactions_filter(user: BenchUser, rnd: random.Random) -> RequestSpec:
+    start = _random_date(rnd, days=3650)
+    end = max(start, _random_date(rnd, days=3650))
+    return RequestSpec(
+        "GET",
+        f"{API_PREFIX}/transaction/category/{rnd.choice(user.category_ids)}/filter",
+        headers=user.headers,
+        params={"search_type": "INTERVAL", "start_date": start, "end_date": end},
+    )
+
+
+def currency_update(user: BenchUser, rnd: random.Random) -> RequestSpec:
+    # Seeded rows are all in UAH, so the queued conversion is a no-op
+    # for the data and only the enqueue path is measured. The range is
+    # fixed, repeated requests of a user are coalesced instead of rejected
+    return RequestSpec(
+        "PATCH",
+        f"{API_PREFIX}/transaction/currency",
+        headers=user.headers,
+        json={
+            "currency_to_update": "USD",
+            "currency_to_replace": "EUR",
+            "cross_course": 1.0,
+            "start_date": (date.today() - timedelta(days=3650)).isoformat(),
+            "end_date": date.today().isoformat(),
+        },
+    )
+
+
+SCENARIOS = [
+    Scenario("login", login),
+    Scenario("create_transaction", create_transaction, remember_transaction),
+    Scenario(
+        "update_transaction",
+        update_transaction,
+        requires=lambda user: bool(user.transaction_ids),
+    ),
+    Scenario("categories", categories("/")),
+    Scenario("expense_categories", categories("/my/expense")),
+    Scenario("income_categories", categories("/my/income")),
+    Scenario("category_by_id", category_by_id),
+    Scenario("category_transaction_filter", category_filter("/transaction/filter")),
+    Scenario(
+        "expense_category_transaction_filter",
+        category_filter("/expense/transaction/filter"),
+    ),
+    Scenario(
+        "income_category_transaction_filter",
+        category_filter("/income/transaction/filter"),
+    ),
+    Scenario("transactions_by_category", transactions_by_category),
+    Scenario("transactions_filter", transactions_filter),
+    Scenario("currency_update", currency_update),
+]
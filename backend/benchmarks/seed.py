@@ -0,0 +1,31 @@
+import argparse
+from datetime import date
+
+from benchmarks.scenarios import BENCH_EMAIL_PREFIX, BENCH_PASSWORD
+from db.commands.seed_data import DEFAULT_END_DATE, SeedConfig, seed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed DB for API benchmarks")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--categories-per-user", type=int, default=20)
+    parser.add_argument("--transactions", type=int, default=10_000_000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=DEFAULT_END_DATE)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    seed(
+        SeedConfig(
+            users=args.users,
+            categories_min=args.categories_per_user,
+            categories_max=args.categories_per_user,
+            transactions=args.transactions,
+            user_skew=0,
+            years=args.years,
+            end_date=args.end_date,
+            email_prefix=BENCH_EMAIL_PREFIX,
+            password=BENCH_PASSWORD,
+            seed=args.seed,
+            workers=args.workers,
+        )
+    )
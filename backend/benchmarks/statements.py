@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import and_, exists, select
+
+from db import manager, models
+from db.session import DBSession, statement_cache_stats
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def legacy_category_ownership(db: DBSession, user_id: int, category_id: int):
+    db.query(
+        exists().where(
+            and_(
+                models.Category.id == category_id,
+                models.Category.user_id == user_id,
+            )
+        )
+    ).scalar()
+
+
+async def legacy_get_user(db: DBSession, user_id: int, category_id: int):
+    db.query(models.User).filter_by(id=user_id).one_or_none()
+
+
+async def legacy_default_currency(db: DBSession, user_id: int, category_id: int):
+    db.query(models.UserSettings.default_currency).filter(
+        models.UserSettings.user_id == user_id
+    ).scalar()
+
+
+async def category_ownership(db: DBSession, user_id: int, category_id: int):
+    await manager.get_category_type(db, user_id, category_id)
+
+
+async def get_user(db: DBSession, user_id: int, category_id: int):
+    await manager.get_user(db, id=user_id)
+
+
+async def default_currency(db: DBSession, user_id: int, category_id: int):
+    await manager.get_default_currency(db, user_id)
+
+
+QUERIES = {
+    "category_ownership": (legacy_category_ownership, category_ownership),
+    "get_user": (legacy_get_user, get_user),
+    "default_currency": (legacy_default_currency, default_currency),
+}
+
+
+async def measure(
+    query: Callable, db: DBSession, user_id: int, category_id: int, runs: int
+) -> float:
+    """Median CPU microseconds of this process per call, waiting on
+    the database is not counted"""
+    cpu_us: List[float] = []
+    for _ in range(runs):
+        started = time.process_time()
+        await query(db, user_id, category_id)
+        cpu_us.append((time.process_time() - started) * 1_000_000)
+        db.expunge_all()
+    return round(statistics.median(cpu_us), 1)
+
+
+async def main(args: argparse.Namespace) -> Dict:
+    report = {}
+    with DBSession() as db:
+        user_id, category_id = db.execute(
+            select(models.Category.user_id, models.Category.id).limit(1)
+        ).one()
+        for name, (legacy, statement) in QUERIES.items():
+            if args.query and name not in args.query:
+                continue
+            # Warm up, the first call of each form compiles
+            await legacy(db, user_id, category_id)
+            await statement(db, user_id, category_id)
+            report[name] = {
+                "legacy_cpu_us": await measure(
+                    legacy, db, user_id, category_id, args.runs
+                ),
+                "cached_cpu_us": await measure(
+                    statement, db, user_id, category_id, args.runs
+                ),
+            }
+            logger.info(f"{name}: {report[name]}")
+    report["statement_cache"] = statement_cache_stats.as_dict()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure CPU cost of hot queries")
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--query", action="append", help="Run only given query")
+    parser.add_argument("--output", help="Write JSON report to file")
+    args = parser.parse_args()
+    report = asyncio.run(main(args))
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report_json)
+    print(report_json)
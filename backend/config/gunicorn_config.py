@@ -1,6 +1,12 @@
+import gc
 import json
 import multiprocessing
 import os
+import resource
+import signal
+import sys
+import threading
+import time
 
 workers_per_core_str = os.getenv("WORKERS_PER_CORE", "1")
 max_workers_str = os.getenv("MAX_WORKERS")
@@ -36,6 +42,13 @@ use_errorlog = errorlog_var or None
 graceful_timeout_str = os.getenv("GRACEFUL_TIMEOUT", "120")
 timeout_str = os.getenv("TIMEOUT", "120")
 keepalive_str = os.getenv("KEEP_ALIVE", "5")
+preload_app_str = os.getenv("PRELOAD_APP", "false")
+max_requests_str = os.getenv("MAX_REQUESTS", "0")
+max_requests_jitter_str = os.getenv("MAX_REQUESTS_JITTER", "0")
+max_memory_growth_str = os.getenv("MAX_WORKER_MEMORY_GROWTH_MB", "0")
+memory_check_interval_str = os.getenv("MEMORY_CHECK_INTERVAL", "30")
+# Proxies whose X-Forwarded-For sets the client address, e.g. nginx
+forwarded_allow_ips_str = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
 
 # Gunicorn config variables
 loglevel = use_loglevel
@@ -47,6 +60,12 @@ accesslog = use_accesslog
 graceful_timeout = int(graceful_timeout_str)
 timeout = int(timeout_str)
 keepalive = int(keepalive_str)
+preload_app = preload_app_str.lower() in ("1", "true", "yes")
+max_requests = int(max_requests_str)
+max_requests_jitter = int(max_requests_jitter_str)
+max_memory_growth = int(max_memory_growth_str)
+memory_check_interval = int(memory_check_interval_str)
+forwarded_allow_ips = forwarded_allow_ips_str
 
 
 # For debugging and testing
@@ -57,13 +76,86 @@ log_data = {
     "graceful_timeout": graceful_timeout,
     "timeout": timeout,
     "keepalive": keepalive,
+    "preload_app": preload_app,
+    "max_requests": max_requests,
+    "max_requests_jitter": max_requests_jitter,
     "errorlog": errorlog,
     "accesslog": accesslog,
+    "forwarded_allow_ips": forwarded_allow_ips,
     # Additional, non-gunicorn variables
     "workers_per_core": workers_per_core,
     "use_max_workers": use_max_workers,
     "host": host,
     "port": port,
     "loop": loop,
+    "max_memory_growth": max_memory_growth,
 }
 print(json.dumps(log_data))
+
+
+def memory_usage():
+    """Current RSS and PSS of the process in MB. PSS splits pages shared
+    with the master and other workers, so it shows the copy-on-write gain"""
+    usage = {}
+    try:
+        with open("/proc/self/smaps_rollup") as smaps:
+            for line in smaps:
+                key, _, value = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    usage[key.lower()] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        # Not Linux, peak RSS is the best available approximation
+        usage["rss"] = round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        )
+    return usage
+
+
+def watch_memory_growth(worker, boot_rss):
+    """Recycle the worker gracefully once its RSS has grown by
+    `max_memory_growth` MB since boot, the master forks a fresh one"""
+    while worker.alive:
+        time.sleep(memory_check_interval)
+        rss = memory_usage().get("rss", boot_rss)
+        if rss - boot_rss > max_memory_growth:
+            worker.log.info(
+                f"Worker {worker.pid} grew from {boot_rss}MB to {rss}MB, recycling"
+            )
+            os.kill(worker.pid, signal.SIGTERM)
+            return
+
+
+# Gunicorn server hooks
+def when_ready(server):
+    if not preload_app:
+        return
+    app = server.app.wsgi()
+    # Build the cached OpenAPI schema once, workers inherit it
+    app.openapi()
+    # Move preloaded objects out of GC tracking, so collections in workers
+    # don't touch and copy the pages shared with the master
+    gc.freeze()
+    server.log.info(f"Application preloaded, master memory {memory_usage()}")
+
+
+def pre_fork(server, worker):
+    worker.boot_started = time.monotonic()
+
+
+def post_fork(server, worker):
+    # Pooled connections opened in the master must not be shared with workers
+    if "db.session" in sys.modules:
+        sys.modules["db.session"].engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    boot_time = time.monotonic() - worker.boot_started
+    usage = memory_usage()
+    worker.log.info(f"Worker {worker.pid} booted in {boot_time:.3f}s, memory {usage}")
+    if max_memory_growth and "rss" in usage:
+        threading.Thread(
+            target=watch_memory_growth,
+            args=(worker, usage["rss"]),
+            name="memory-watchdog",
+            daemon=True,
+        ).start()
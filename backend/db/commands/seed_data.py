@@ -0,0 +1,374 @@
+import argparse
+import csv
+import io
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Tuple
+
+from sqlalchemy import create_engine, pool, text
+
+from db.models import OVERALL_CATEGORY_ID, CategoryTypeEnum, CurrencyEnum
+from db.session import DBSession
+from service.core import settings
+from service.core.security import set_password_hash
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NOTES = ("coffee", "groceries", "rent", "salary", "taxi", "gift", "restaurant")
+# Fixed, so one --seed gives the same data on any day
+DEFAULT_END_DATE = date(2026, 1, 1)
+
+
+@dataclass
+class SeedConfig:
+    users: int = 1000
+    categories_min: int = 5
+    categories_max: int = 30
+    income_share: float = 0.25
+    transactions: int = 1_000_000
+    user_skew: float = 1.2
+    amount_mu: float = 5.0
+    amount_sigma: float = 1.2
+    years: int = 10
+    currencies: Dict[str, float] = field(
+        default_factory=lambda: {CurrencyEnum.UAH.value: 1.0}
+    )
+    note_ratio: float = 0.3
+    notification_ratio: float = 0.8
+    email_prefix: str = "seed_"
+    password: str = "seed-password"
+    seed: int = 42
+    workers: int = 4
+    chunk_size: int = 200_000
+    end_date: date = DEFAULT_END_DATE
+
+    def __post_init__(self):
+        # Every user needs a category to attach transactions to
+        if not 1 <= self.categories_min <= self.categories_max:
+            raise ValueError("Expected 1 <= categories_min <= categories_max")
+
+
+@dataclass
+class TransactionChunk:
+    number: int
+    first_id: int
+    # (user_id, [(category_id, type), ...], transactions count)
+    users: List[Tuple[int, List[Tuple[int, str]], int]]
+
+
+def next_id(db: DBSession, table: str) -> int:
+    return db.execute(text(f'SELECT coalesce(max(id), 0) + 1 FROM "{table}"')).scalar()
+
+
+def copy_rows(cursor, table: str, columns: List[str], rows: Iterator) -> None:
+    """Stream rows to Postgres with COPY, the fastest way to bulk load"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(
+        f'COPY "{table}" ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', buffer
+    )
+
+
+def rebuild_user_balance(db: DBSession, first_user_id: int, last_user_id: int) -> None:
+    """Month running balances of the seeded users in one set-based statement,
+    COPY bypasses the per transaction aggregate updates"""
+    db.execute(
+        text(
+            """
+            INSERT INTO user_balance (user_id, currency, month, amount)
+            SELECT user_id, currency, month,
+                   sum(net) OVER (PARTITION BY user_id, currency ORDER BY month)
+            FROM (
+                SELECT t.user_id, t.currency,
+                       CAST(date_trunc('month', t.date) AS date) AS month,
+                       sum(CASE WHEN c.type = :income THEN t.amount
+                                ELSE -t.amount END) AS net
+                FROM transaction AS t
+                JOIN category AS c ON c.id = t.category_id
+                WHERE t.user_id BETWEEN :first_user_id AND :last_user_id
+                  AND c.deleted_at IS NULL
+                GROUP BY 1, 2, 3
+            ) AS monthly
+            """
+        ),
+        {
+            "income": CategoryTypeEnum.INCOME.value,
+            "first_user_id": first_user_id,
+            "last_user_id": last_user_id,
+        },
+    )
+
+
+def rebuild_budget_spending(
+    db: DBSession, first_user_id: int, last_user_id: int
+) -> None:
+    """Monthly expense counters of the seeded users, per category and
+    overall, from one pass over their transactions"""
+    db.execute(
+        text(
+            """
+            INSERT INTO budget_spending (user_id, category_id, currency, month, amount)
+            SELECT t.user_id, coalesce(t.category_id, :overall), t.currency,
+                   CAST(date_trunc('month', t.date) AS date), sum(t.amount)
+            FROM transaction AS t
+            JOIN category AS c ON c.id = t.category_id
+            WHERE t.user_id BETWEEN :first_user_id AND :last_user_id
+              AND c.type = :expense AND c.deleted_at IS NULL
+            GROUP BY GROUPING SETS (
+                (t.user_id, t.category_id, t.currency, date_trunc('month', t.date)),
+                (t.user_id, t.currency, date_trunc('month', t.date))
+            )
+            """
+        ),
+        {
+            "overall": OVERALL_CATEGORY_ID,
+            "expense": CategoryTypeEnum.EXPENSE.value,
+            "first_user_id": first_user_id,
+            "last_user_id": last_user_id,
+        },
+    )
+
+
+def user_weights(config: SeedConfig, rnd: random.Random) -> List[float]:
+    """Pareto distributed activity, user_skew = 0 spreads transactions evenly"""
+    if config.user_skew <= 0:
+        return [1.0] * config.users
+    return [rnd.paretovariate(config.user_skew) for _ in range(config.users)]
+
+
+def split_transactions(total: int, weights: List[float]) -> List[int]:
+    """Deterministically split total into integer counts proportional to weights"""
+    weights_sum = sum(weights)
+    counts = [int(total * weight / weights_sum) for weight in weights]
+    remainders = sorted(
+        range(len(weights)),
+        key=lambda i: total * weights[i] / weights_sum - counts[i],
+        reverse=True,
+    )
+    for i in remainders[: total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+def load_transactions_chunk(args: Tuple[SeedConfig, TransactionChunk]) -> int:
+    config, chunk = args
+    rnd = random.Random(f"{config.seed}-transactions-{chunk.number}")
+    currencies, currency_weights = zip(*config.currencies.items())
+    days = config.years * 365
+
+    def rows() -> Iterator:
+        transaction_id = chunk.first_id
+        for user_id, categories, count in chunk.users:
+            for _ in range(count):
+                category_id, _type = rnd.choice(categories)
+                amount = round(
+                    rnd.lognormvariate(config.amount_mu, config.amount_sigma), 2
+                )
+                note = rnd.choice(NOTES) if rnd.random() < config.note_ratio else None
+                yield (
+                    transaction_id,
+                    user_id,
+                    category_id,
+                    amount,
+                    rnd.choices(currencies, currency_weights)[0],
+                    config.end_date - timedelta(days=rnd.randrange(days)),
+                    note,
+                )
+                transaction_id += 1
+
+    # Every process needs its own connection, engines can't be shared over fork
+    engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, poolclass=pool.NullPool)
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            copy_rows(
+                cursor,
+                "transaction",
+                ["id", "user_id", "category_id", "amount", "currency", "date", "note"],
+                rows(),
+            )
+        connection.commit()
+    finally:
+        connection.close()
+    return sum(count for *_, count in chunk.users)
+
+
+def seed(config: SeedConfig) -> None:
+    rnd = random.Random(config.seed)
+    with DBSession() as db:
+        exist = db.execute(
+            text('SELECT count(*) FROM "user" WHERE email LIKE :pattern'),
+            {"pattern": f"{config.email_prefix}%"},
+        ).scalar()
+        if exist:
+            logger.info(f"{exist} {config.email_prefix}* users already exist, skip")
+            return
+        user_id = next_id(db, "user")
+        settings_id = next_id(db, "user_settings")
+        category_id = next_id(db, "category")
+        transaction_id = next_id(db, "transaction")
+
+        started = time.monotonic()
+        currencies, currency_weights = zip(*config.currencies.items())
+        hashed_password = set_password_hash(config.password)
+        users, user_settings, categories = [], [], []
+        user_categories: List[List[Tuple[int, str]]] = []
+        for number in range(1, config.users + 1):
+            users.append(
+                (
+                    user_id,
+                    f"{config.email_prefix}{number}@example.com",
+                    hashed_password,
+                    False,
+                    date(1960, 1, 1) + timedelta(days=rnd.randrange(15000)),
+                )
+            )
+            user_settings.append(
+                (
+                    settings_id,
+                    user_id,
+                    rnd.random() < config.notification_ratio,
+                    rnd.choices(currencies, currency_weights)[0],
+                    config.end_date,
+                )
+            )
+            owned = []
+            for position in range(
+                rnd.randint(config.categories_min, config.categories_max)
+            ):
+                category_type = (
+                    CategoryTypeEnum.INCOME.value
+                    if rnd.random() < config.income_share
+                    else CategoryTypeEnum.EXPENSE.value
+                )
+                categories.append(
+                    (category_id, user_id, f"Category {position + 1}", category_type)
+                )
+                owned.append((category_id, category_type))
+                category_id += 1
+            user_categories.append(owned)
+            user_id += 1
+            settings_id += 1
+
+        connection = db.connection().connection
+        with connection.cursor() as cursor:
+            copy_rows(
+                cursor,
+                "user",
+                ["id", "email", "hashed_password", "is_superuser", "birthday"],
+                users,
+            )
+            copy_rows(
+                cursor,
+                "user_settings",
+                ["id", "user_id", "notification_on", "default_currency", "created_at"],
+                user_settings,
+            )
+            copy_rows(
+                cursor, "category", ["id", "user_id", "title", "type"], categories
+            )
+        db.commit()
+        logger.info(
+            f"{len(users)} users and {len(categories)} categories have been created"
+        )
+
+        counts = split_transactions(config.transactions, user_weights(config, rnd))
+        chunks, current = [], TransactionChunk(0, transaction_id, [])
+        loaded_in_chunk = 0
+        for (uid, *_), owned, count in zip(users, user_categories, counts):
+            current.users.append((uid, owned, count))
+            loaded_in_chunk += count
+            transaction_id += count
+            if loaded_in_chunk >= config.chunk_size:
+                chunks.append(current)
+                current = TransactionChunk(len(chunks), transaction_id, [])
+                loaded_in_chunk = 0
+        if current.users:
+            chunks.append(current)
+
+        loaded = 0
+        with Pool(config.workers) as workers:
+            for count in workers.imap_unordered(
+                load_transactions_chunk, [(config, chunk) for chunk in chunks]
+            ):
+                loaded += count
+                logger.info(f"{loaded}/{config.transactions} transactions loaded")
+
+        rebuild_user_balance(db, user_id - len(users), user_id - 1)
+        rebuild_budget_spending(db, user_id - len(users), user_id - 1)
+        db.commit()
+        logger.info("Aggregates have been rebuilt")
+
+        for table in ("user", "user_settings", "category", "transaction"):
+            db.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                    f'(SELECT max(id) FROM "{table}"))'
+                )
+            )
+        db.commit()
+        db.execute(text("ANALYZE"))
+        db.commit()
+        logger.info(f"Seeding took {time.monotonic() - started:.1f}s")
+
+
+def parse_currencies(value: str) -> Dict[str, float]:
+    """Parse `UAH:0.8,USD:0.2` into currency weights"""
+    currencies = {}
+    for item in value.split(","):
+        currency, _, weight = item.partition(":")
+        currencies[CurrencyEnum(currency.strip().upper()).value] = float(weight or 1)
+    return currencies
+
+
+def parse_args() -> SeedConfig:
+    defaults = SeedConfig()
+    parser = argparse.ArgumentParser(description="Generate synthetic data")
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--categories-min", type=int, default=defaults.categories_min)
+    parser.add_argument("--categories-max", type=int, default=defaults.categories_max)
+    parser.add_argument("--income-share", type=float, default=defaults.income_share)
+    parser.add_argument("--transactions", type=int, default=defaults.transactions)
+    parser.add_argument(
+        "--user-skew",
+        type=float,
+        default=defaults.user_skew,
+        help="Pareto alpha of transactions per user, 0 for uniform",
+    )
+    parser.add_argument("--amount-mu", type=float, default=defaults.amount_mu)
+    parser.add_argument("--amount-sigma", type=float, default=defaults.amount_sigma)
+    parser.add_argument("--years", type=int, default=defaults.years)
+    parser.add_argument(
+        "--currencies",
+        type=parse_currencies,
+        default=defaults.currencies,
+        help="Currency weights, e.g. UAH:0.8,USD:0.15,EUR:0.05",
+    )
+    parser.add_argument("--note-ratio", type=float, default=defaults.note_ratio)
+    parser.add_argument(
+        "--notification-ratio", type=float, default=defaults.notification_ratio
+    )
+    parser.add_argument("--email-prefix", default=defaults.email_prefix)
+    parser.add_argument("--password", default=defaults.password)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--workers", type=int, default=defaults.workers)
+    parser.add_argument("--chunk-size", type=int, default=defaults.chunk_size)
+    parser.add_argument(
+        "--end-date", type=date.fromisoformat, default=defaults.end_date
+    )
+    args = parser.parse_args()
+    try:
+        return SeedConfig(**vars(args))
+    except ValueError as exc:
+        parser.error(str(exc))
+
+
+if __name__ == "__main__":
+    seed(parse_args())
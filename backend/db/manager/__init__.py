@@ -1,8 +1,56 @@
-from .user import create_user, get_user, instance_exist
+from .balance import get_balance_at
+from .budget import delete_budget, get_budgets_usage, save_budget
+from .category import (create_category, get_category_type,
+                       soft_delete_category, update_category)
+from .exchange_rate import (converted_amount, get_rates_cache, rates_cache,
+                            save_exchange_rate)
+from .job import (create_job, fail_job, get_job_status,
+                  get_overlapping_currency_job, publish_job)
+from .lock import LockNamespace, advisory_xact_lock
+from .transaction import (TransactionChange, apply_transaction_changes,
+                          bulk_delete_transactions, bulk_move_transactions,
+                          create_transaction, move_category_aggregates,
+                          rebuild_transaction_aggregates, update_transaction)
+from .user import create_user, get_default_currency, get_user, instance_exist
 
 __all__ = (
     # User
     "get_user",
     "create_user",
     "instance_exist",
+    "get_default_currency",
+    # Category
+    "get_category_type",
+    "create_category",
+    "update_category",
+    "soft_delete_category",
+    # Exchange rate
+    "rates_cache",
+    "get_rates_cache",
+    "save_exchange_rate",
+    "converted_amount",
+    # Transaction
+    "TransactionChange",
+    "apply_transaction_changes",
+    "rebuild_transaction_aggregates",
+    "move_category_aggregates",
+    "create_transaction",
+    "update_transaction",
+    "bulk_delete_transactions",
+    "bulk_move_transactions",
+    # Balance
+    "get_balance_at",
+    # Budget
+    "save_budget",
+    "delete_budget",
+    "get_budgets_usage",
+    # Job
+    "create_job",
+    "publish_job",
+    "fail_job",
+    "get_job_status",
+    "get_overlapping_currency_job",
+    # Lock
+    "LockNamespace",
+    "advisory_xact_lock",
 )
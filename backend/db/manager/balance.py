@@ -0,0 +1,129 @@
+from datetime import date
+from decimal import Decimal
+from typing import Dict
+
+from sqlalchemy import (Date, case, cast, delete, func, literal, select,
+                        union_all, update)
+from sqlalchemy.dialects.postgresql import insert
+
+from db.models import Category, CategoryTypeEnum, Transaction, UserBalance
+from db.session import DBSession
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def signed_amount():
+    """Transaction.amount as balance change, incomes add and expenses subtract"""
+    return case(
+        (Category.type == CategoryTypeEnum.INCOME.value, Transaction.amount),
+        else_=-Transaction.amount,
+    )
+
+
+async def apply_balance_delta(
+    db: DBSession, user_id: int, currency: str, month: date, delta: Decimal
+) -> None:
+    """Add delta to the closing balance of the month and every later month.
+    A missing month row is seeded with the previous closing balance first"""
+    previous = (
+        select(UserBalance.amount)
+        .where(
+            UserBalance.user_id == user_id,
+            UserBalance.currency == currency,
+            UserBalance.month < month,
+        )
+        .order_by(UserBalance.month.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    db.execute(
+        insert(UserBalance)
+        .values(
+            user_id=user_id,
+            currency=currency,
+            month=month,
+            amount=func.coalesce(previous, 0),
+        )
+        .on_conflict_do_nothing(
+            index_elements=[
+                UserBalance.user_id,
+                UserBalance.currency,
+                UserBalance.month,
+            ]
+        )
+    )
+    db.execute(
+        update(UserBalance)
+        .where(
+            UserBalance.user_id == user_id,
+            UserBalance.currency == currency,
+            UserBalance.month >= month,
+        )
+        .values(amount=UserBalance.amount + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def rebuild_user_balance(db: DBSession, user_id: int) -> None:
+    """Recalculate all month balances of the user from transactions"""
+    db.execute(
+        delete(UserBalance)
+        .where(UserBalance.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+    month = cast(func.date_trunc("month", Transaction.date), Date)
+    monthly = (
+        select(
+            Transaction.currency,
+            month.label("month"),
+            func.sum(signed_amount()).label("net"),
+        )
+        .join(Category, Category.id == Transaction.category_id)
+        .where(Transaction.user_id == user_id, Category.deleted_at.is_(None))
+        .group_by(Transaction.currency, "month")
+        .subquery("monthly")
+    )
+    db.execute(
+        insert(UserBalance).from_select(
+            ["user_id", "currency", "month", "amount"],
+            select(
+                literal(user_id),
+                monthly.c.currency,
+                monthly.c.month,
+                func.sum(monthly.c.net).over(
+                    partition_by=monthly.c.currency, order_by=monthly.c.month
+                ),
+            ),
+        )
+    )
+
+
+async def get_balance_at(db: DBSession, user_id: int, at: date) -> Dict[str, Decimal]:
+    """Balance per currency at the end of `at` day.
+    Closing balance of the last month before `at` is an index lookup,
+    only transactions of the `at` month itself are summed"""
+    month = month_start(at)
+    closing = (
+        select(UserBalance.currency, UserBalance.amount)
+        .distinct(UserBalance.currency)
+        .where(UserBalance.user_id == user_id, UserBalance.month < month)
+        .order_by(UserBalance.currency, UserBalance.month.desc())
+    )
+    current = (
+        select(Transaction.currency, func.sum(signed_amount()))
+        .join(Category, Category.id == Transaction.category_id)
+        .where(
+            Transaction.user_id == user_id,
+            Transaction.date >= month,
+            Transaction.date <= at,
+            Category.deleted_at.is_(None),
+        )
+        .group_by(Transaction.currency)
+    )
+    parts = union_all(closing, current).subquery("parts")
+    balances = db.execute(
+        select(parts.c.currency, func.sum(parts.c.amount)).group_by(parts.c.currency)
+    ).all()
+    return {currency: amount for currency, amount in balances}
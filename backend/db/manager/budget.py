@@ -0,0 +1,179 @@
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import (Date, Row, and_, cast, delete, func, literal, or_,
+                        select, union_all)
+from sqlalchemy.dialects.postgresql import insert
+
+from db.models import (OVERALL_CATEGORY_ID, Budget, BudgetSpending, Category,
+                       CategoryTypeEnum, Transaction)
+from db.session import DBSession
+
+# (category_id, currency, month)
+SpendingKey = Tuple[int, str, date]
+
+category_table = Category.__table__
+
+
+async def apply_spending_deltas(
+    db: DBSession, user_id: int, deltas: Dict[SpendingKey, Decimal]
+) -> None:
+    """Add expense deltas to category and overall month counters
+    with one multi-row upsert"""
+    overall: Dict[SpendingKey, Decimal] = {}
+    for (_, currency, month), delta in deltas.items():
+        key = (OVERALL_CATEGORY_ID, currency, month)
+        overall[key] = overall.get(key, Decimal(0)) + delta
+    rows = [
+        {
+            "user_id": user_id,
+            "category_id": category_id,
+            "currency": currency,
+            "month": month,
+            "amount": delta,
+        }
+        for (category_id, currency, month), delta in sorted(
+            {**deltas, **overall}.items()
+        )
+        if delta
+    ]
+    if not rows:
+        return
+    stmt = insert(BudgetSpending).values(rows)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[
+                BudgetSpending.user_id,
+                BudgetSpending.category_id,
+                BudgetSpending.currency,
+                BudgetSpending.month,
+            ],
+            set_={"amount": BudgetSpending.amount + stmt.excluded.amount},
+        )
+    )
+
+
+async def rebuild_budget_spending(db: DBSession, user_id: int) -> None:
+    """Recalculate all spending counters of the user from transactions"""
+    db.execute(
+        delete(BudgetSpending)
+        .where(BudgetSpending.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+    month = cast(func.date_trunc("month", Transaction.date), Date)
+    expenses = (
+        select(
+            Transaction.category_id,
+            Transaction.currency,
+            month.label("month"),
+            Transaction.amount,
+        )
+        .join(Category, Category.id == Transaction.category_id)
+        .where(
+            Transaction.user_id == user_id,
+            Category.type == CategoryTypeEnum.EXPENSE.value,
+            Category.deleted_at.is_(None),
+        )
+        .cte("expenses")
+    )
+    per_category = select(
+        expenses.c.category_id,
+        expenses.c.currency,
+        expenses.c.month,
+        func.sum(expenses.c.amount),
+    ).group_by(expenses.c.category_id, expenses.c.currency, expenses.c.month)
+    overall = select(
+        literal(OVERALL_CATEGORY_ID),
+        expenses.c.currency,
+        expenses.c.month,
+        func.sum(expenses.c.amount),
+    ).group_by(expenses.c.currency, expenses.c.month)
+    totals = union_all(per_category, overall).subquery("totals")
+    db.execute(
+        insert(BudgetSpending).from_select(
+            ["user_id", "category_id", "currency", "month", "amount"],
+            select(literal(user_id), *totals.c),
+        )
+    )
+
+
+async def save_budget(db: DBSession, user_id: int, data: Dict) -> Optional[Row]:
+    """Create or overwrite the limit of a category or the overall budget.
+    Category must be user's expense category, otherwise None"""
+    category_id = data.get("category_id")
+    if category_id is not None:
+        owned = db.execute(
+            select(Category.id).where(
+                Category.id == category_id,
+                Category.user_id == user_id,
+                Category.type == CategoryTypeEnum.EXPENSE.value,
+            )
+        ).scalar()
+        if owned is None:
+            return None
+    stmt = insert(Budget.__table__).values(user_id=user_id, **data)
+    if category_id is None:
+        conflict = {
+            "index_elements": [Budget.user_id],
+            "index_where": Budget.category_id.is_(None),
+        }
+    else:
+        conflict = {
+            "index_elements": [Budget.user_id, Budget.category_id],
+            "index_where": Budget.category_id.isnot(None),
+        }
+    return db.execute(
+        stmt.on_conflict_do_update(
+            **conflict,
+            set_={"amount": stmt.excluded.amount, "currency": stmt.excluded.currency},
+        ).returning(*Budget.__table__.c)
+    ).one()
+
+
+async def delete_budget(db: DBSession, user_id: int, budget_id: int) -> bool:
+    """Delete user's budget, False when it is not found"""
+    return (
+        db.execute(
+            delete(Budget.__table__)
+            .where(Budget.id == budget_id, Budget.user_id == user_id)
+            .returning(Budget.id)
+        ).scalar()
+        is not None
+    )
+
+
+async def get_budgets_usage(db: DBSession, user_id: int, month: date) -> List[Row]:
+    """All budgets of the user with spending of the month in one query,
+    each budget joins its counter row by primary key"""
+    spending = and_(
+        BudgetSpending.user_id == Budget.user_id,
+        BudgetSpending.category_id
+        == func.coalesce(Budget.category_id, OVERALL_CATEGORY_ID),
+        BudgetSpending.currency == Budget.currency,
+        BudgetSpending.month == month,
+    )
+    return db.execute(
+        select(
+            Budget.id,
+            Budget.category_id,
+            Budget.currency,
+            Budget.amount,
+            func.coalesce(BudgetSpending.amount, 0).label("spent"),
+        )
+        .outerjoin(BudgetSpending, spending)
+        .where(
+            Budget.user_id == user_id,
+            # Core table, the soft-delete criteria must not apply here
+            or_(
+                Budget.category_id.is_(None),
+                Budget.category_id.notin_(
+                    select(category_table.c.id).where(
+                        category_table.c.user_id == user_id,
+                        category_table.c.deleted_at.isnot(None),
+                    )
+                ),
+            ),
+        )
+        .order_by(Budget.category_id.nulls_first(), Budget.id)
+    ).all()
@@ -0,0 +1,87 @@
+from typing import Dict, Optional
+
+from sqlalchemy import (Row, bindparam, exists, func, insert, literal, select,
+                        update)
+
+from db.models import Category
+from db.session import DBSession
+
+# Built once, executions only bind parameters and hit the compiled cache
+_category_type = select(Category.type).where(
+    Category.id == bindparam("category_id"),
+    Category.user_id == bindparam("user_id"),
+)
+
+
+async def get_category_type(
+    db: DBSession, user_id: int, category_id: int
+) -> Optional[str]:
+    """Type of the category if user owns it, otherwise None"""
+    return db.execute(
+        _category_type, {"category_id": category_id, "user_id": user_id}
+    ).scalar()
+
+
+async def create_category(db: DBSession, user_id: int, data: Dict) -> Optional[Row]:
+    """Insert category with one INSERT ... SELECT WHERE NOT EXISTS,
+    None when user already has active category with the title and type"""
+    table = Category.__table__
+    values = {"user_id": user_id, **data}
+    duplicate = exists().where(
+        table.c.user_id == user_id,
+        table.c.title == data["title"],
+        table.c.type == data["type"],
+        table.c.deleted_at.is_(None),
+    )
+    return db.execute(
+        insert(table)
+        .from_select(
+            list(values),
+            select(
+                *(literal(value, table.c[name].type) for name, value in values.items())
+            ).where(~duplicate),
+        )
+        .returning(*table.c)
+    ).one_or_none()
+
+
+async def update_category(
+    db: DBSession, user_id: int, category_id: int, data: Dict
+) -> Optional[Row]:
+    """Update owned category with one UPDATE ... FROM, RETURNING carries
+    the previous type. None when the category is not found"""
+    table = Category.__table__
+    old = (
+        select(table.c.id, table.c.type)
+        .where(
+            table.c.id == category_id,
+            table.c.user_id == user_id,
+            table.c.deleted_at.is_(None),
+        )
+        .with_for_update()
+        .subquery("old")
+    )
+    return db.execute(
+        update(table)
+        .where(table.c.id == old.c.id)
+        .values(**data)
+        .returning(*table.c, old.c.type.label("old_type"))
+    ).one_or_none()
+
+
+async def soft_delete_category(
+    db: DBSession, user_id: int, category_id: int
+) -> Optional[str]:
+    """Mark owned category as deleted, returns its type.
+    None when it is not found"""
+    table = Category.__table__
+    return db.execute(
+        update(table)
+        .where(
+            table.c.id == category_id,
+            table.c.user_id == user_id,
+            table.c.deleted_at.is_(None),
+        )
+        .values(deleted_at=func.now())
+        .returning(table.c.type)
+    ).scalar()
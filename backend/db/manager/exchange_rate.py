@@ -0,0 +1,169 @@
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from db.models import ExchangeRate, Transaction
+from db.session import DBSession
+from service.core import settings
+
+Pair = Tuple[str, str]
+Rates = Tuple[List[date], List[Optional[Decimal]]]
+
+
+class ExchangeRateCache:
+    """In-memory copy of the exchange_rate table.
+    Rates are kept per currency pair as date-sorted lists, so a lookup is
+    a bisect and not a query. Like `converted_amount`, a date without
+    a direct rate is served from the inverse pair.
+    Every process keeps its own copy, a saved rate reaches other
+    processes once their copy outlives `ttl`"""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._loaded_at: Optional[float] = None
+        self._rates: Dict[Pair, Rates] = {}
+        # Inverted rates of (quote, base) stored under (base, quote)
+        self._inverse: Dict[Pair, Rates] = {}
+
+    @property
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    def load(self, db: DBSession) -> None:
+        rows = db.execute(
+            select(
+                ExchangeRate.base_currency,
+                ExchangeRate.quote_currency,
+                ExchangeRate.date,
+                ExchangeRate.rate,
+            ).order_by(ExchangeRate.date)
+        )
+        direct: Dict[Pair, Rates] = defaultdict(lambda: ([], []))
+        for base, quote, rate_date, rate in rows:
+            dates, rates = direct[(base, quote)]
+            dates.append(rate_date)
+            rates.append(rate)
+        self._rates = dict(direct)
+        self._inverse = {
+            (quote, base): (dates, [1 / rate if rate else None for rate in rates])
+            for (base, quote), (dates, rates) in direct.items()
+        }
+        self._loaded_at = time.monotonic()
+
+    def rate(self, base: str, quote: str, on_date: date) -> Optional[Decimal]:
+        """Latest known rate on or before `on_date`"""
+        if base == quote:
+            return Decimal(1)
+        for pairs in (self._rates, self._inverse):
+            dates, rates = pairs.get((base, quote), ((), ()))
+            position = bisect_right(dates, on_date)
+            if position and rates[position - 1] is not None:
+                return rates[position - 1]
+        return None
+
+    def convert(
+        self,
+        amounts: Sequence[Decimal],
+        currencies: Sequence[str],
+        dates: Sequence[date],
+        target: str,
+    ) -> List[Optional[Decimal]]:
+        """Convert a batch of amounts into `target` currency.
+        Items are grouped per pair and walked in date order, so each pair
+        costs one sort and one merge pass instead of a bisect per item.
+        Amounts without a known rate are returned as None"""
+        converted: List[Optional[Decimal]] = [None] * len(amounts)
+        groups: Dict[str, List[int]] = defaultdict(list)
+        for index, currency in enumerate(currencies):
+            groups[currency].append(index)
+        for currency, indexes in groups.items():
+            if currency == target:
+                for index in indexes:
+                    converted[index] = amounts[index]
+                continue
+            direct_dates, direct_rates = self._rates.get((currency, target), ((), ()))
+            inverse_dates, inverse_rates = self._inverse.get(
+                (currency, target), ((), ())
+            )
+            indexes.sort(key=dates.__getitem__)
+            direct = inverse = 0
+            for index in indexes:
+                while (
+                    direct < len(direct_dates) and direct_dates[direct] <= dates[index]
+                ):
+                    direct += 1
+                while (
+                    inverse < len(inverse_dates)
+                    and inverse_dates[inverse] <= dates[index]
+                ):
+                    inverse += 1
+                rate = direct_rates[direct - 1] if direct else None
+                if rate is None and inverse:
+                    rate = inverse_rates[inverse - 1]
+                if rate is not None:
+                    converted[index] = amounts[index] * rate
+        return converted
+
+
+rates_cache = ExchangeRateCache(ttl=settings.EXCHANGE_RATE_CACHE_TTL)
+
+
+async def get_rates_cache(db: DBSession) -> ExchangeRateCache:
+    """Return exchange rate cache, reload it when TTL has expired"""
+    if rates_cache.is_stale:
+        rates_cache.load(db)
+    return rates_cache
+
+
+async def save_exchange_rate(db: DBSession, rate_data: Dict) -> ExchangeRate:
+    """Create or overwrite rate of the currency pair on the date.
+    Only the cache of this process is invalidated, other processes
+    serve the previous rate until their cache expires"""
+    stmt = insert(ExchangeRate).values(**rate_data)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            ExchangeRate.base_currency,
+            ExchangeRate.quote_currency,
+            ExchangeRate.date,
+        ],
+        set_={"rate": stmt.excluded.rate},
+    ).returning(ExchangeRate)
+    rate = db.scalars(stmt).one()
+    rates_cache.invalidate()
+    return rate
+
+
+def _latest_rate(base, quote):
+    return (
+        select(ExchangeRate.rate)
+        .where(
+            ExchangeRate.base_currency == base,
+            ExchangeRate.quote_currency == quote,
+            ExchangeRate.date <= Transaction.date,
+        )
+        .order_by(ExchangeRate.date.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def converted_amount(currency: str):
+    """SQL expression of Transaction.amount in `currency` on transaction date.
+    Each row costs one index probe of ix_exchange_rate_pair_date_btree,
+    rows without a known rate evaluate to NULL"""
+    return Transaction.amount * case(
+        (Transaction.currency == currency, 1),
+        else_=func.coalesce(
+            _latest_rate(Transaction.currency, currency),
+            1 / func.nullif(_latest_rate(currency, Transaction.currency), 0),
+        ),
+    )
@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import Date, func, select, update
+
+from db.models import Job, JobStatusEnum, JobTypeEnum
+from db.session import DBSession
+from service.core import settings
+
+
+async def create_job(
+    db: DBSession, user_id: int, job_type: str, params: Dict, total_shards: int = 1
+) -> Job:
+    job = Job(user_id=user_id, type=job_type, params=params, total_shards=total_shards)
+    db.add(job)
+    db.flush()
+    return job
+
+
+async def publish_job(db: DBSession, job_id: int) -> None:
+    """Mark job, whose tasks the broker has accepted, as safe to coalesce into"""
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(published=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def fail_job(db: DBSession, job_id: int, error: str) -> None:
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(
+            status=JobStatusEnum.FAILURE.value, error=error, finished_at=func.now()
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def get_job_status(db: DBSession, job_id: int, user_id: int) -> Optional[Dict]:
+    """Job status by primary key, without loading params and shard list"""
+    row = db.execute(
+        select(
+            Job.id,
+            Job.type,
+            Job.status,
+            Job.total_shards,
+            func.cardinality(Job.completed_shards).label("completed_shards"),
+            Job.result,
+            Job.error,
+            Job.created_at,
+            Job.updated_at,
+            Job.finished_at,
+        ).where(Job.id == job_id, Job.user_id == user_id)
+    ).one_or_none()
+    return row._asdict() if row else None
+
+
+async def get_overlapping_currency_job(
+    db: DBSession,
+    user_id: int,
+    currency_to_update: str,
+    currency_to_replace: str,
+    start_date: date,
+    end_date: date,
+) -> Optional[Job]:
+    """Active currency conversion of the user that touches the same rows:
+    same currency pair in either direction with overlapping dates.
+    Jobs without progress for JOB_STALE_AFTER are considered lost"""
+    pair = (currency_to_update, currency_to_replace)
+    return db.scalars(
+        select(Job)
+        .where(
+            Job.user_id == user_id,
+            Job.type == JobTypeEnum.CURRENCY_CONVERSION.value,
+            Job.status.in_([JobStatusEnum.PENDING.value, JobStatusEnum.RUNNING.value]),
+            Job.updated_at > func.now() - timedelta(seconds=settings.JOB_STALE_AFTER),
+            Job.params["currency_to_update"].astext.in_(pair),
+            Job.params["currency_to_replace"].astext.in_(pair),
+            Job.params["start_date"].astext.cast(Date) <= end_date,
+            Job.params["end_date"].astext.cast(Date) >= start_date,
+        )
+        .order_by(Job.id)
+        .limit(1)
+    ).first()
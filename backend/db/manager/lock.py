@@ -0,0 +1,19 @@
+from enum import IntEnum
+
+from sqlalchemy import func, select
+
+from db.session import DBSession
+
+INT4_MAX = 2**31 - 1
+
+
+class LockNamespace(IntEnum):
+    """First key of two-key advisory locks, keeps lock kinds apart"""
+
+    BALANCE = 1
+    JOB = 2
+
+
+async def advisory_xact_lock(db: DBSession, namespace: LockNamespace, key: int) -> None:
+    """Take transaction scoped advisory lock, released on commit or rollback"""
+    db.execute(select(func.pg_advisory_xact_lock(int(namespace), key % INT4_MAX)))
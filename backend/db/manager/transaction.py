@@ -0,0 +1,245 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import (Date, Row, cast, delete, func, insert, literal, select,
+                        update)
+
+from db.models import Category, CategoryTypeEnum, Transaction, UserSettings
+from db.session import DBSession
+
+from .balance import apply_balance_delta, month_start, rebuild_user_balance
+from .budget import apply_spending_deltas, rebuild_budget_spending
+from .lock import LockNamespace, advisory_xact_lock
+
+
+class TransactionChange(NamedTuple):
+    """Transaction added to (positive amount) or removed from (negative amount)
+    the user's history, used to maintain aggregates incrementally"""
+
+    category_type: str
+    category_id: int
+    currency: str
+    date: date
+    amount: Decimal
+
+
+async def apply_transaction_changes(
+    db: DBSession, user_id: int, changes: Iterable[TransactionChange]
+) -> None:
+    """Update aggregates maintained on transaction writes
+    in the same DB transaction as the write itself"""
+    balance_deltas = defaultdict(Decimal)
+    spending_deltas = defaultdict(Decimal)
+    for change in changes:
+        amount = Decimal(str(change.amount))
+        month = month_start(change.date)
+        if change.category_type == CategoryTypeEnum.EXPENSE.value:
+            spending_deltas[(change.category_id, change.currency, month)] += amount
+            amount = -amount
+        balance_deltas[(change.currency, month)] += amount
+    balance_deltas = {key: delta for key, delta in balance_deltas.items() if delta}
+    spending_deltas = {key: delta for key, delta in spending_deltas.items() if delta}
+    if not balance_deltas and not spending_deltas:
+        return
+    await advisory_xact_lock(db, LockNamespace.BALANCE, user_id)
+    for (currency, month), delta in sorted(balance_deltas.items()):
+        await apply_balance_delta(db, user_id, currency, month, delta)
+    await apply_spending_deltas(db, user_id, spending_deltas)
+
+
+async def rebuild_transaction_aggregates(db: DBSession, user_id: int) -> None:
+    """Recalculate aggregates from scratch, used after bulk rewrites
+    like currency conversion or cascade deletes"""
+    await advisory_xact_lock(db, LockNamespace.BALANCE, user_id)
+    await rebuild_user_balance(db, user_id)
+    await rebuild_budget_spending(db, user_id)
+
+
+async def move_category_aggregates(
+    db: DBSession,
+    user_id: int,
+    category_id: int,
+    old_type: Optional[str],
+    new_type: Optional[str],
+) -> None:
+    """Move transactions of the category from `old_type` aggregates to
+    `new_type` ones, None on either side only removes or adds them.
+    Sums per currency and month become deltas, so category delete and
+    type change don't rebuild all aggregates of the user"""
+    month = cast(func.date_trunc("month", Transaction.date), Date)
+    totals = db.execute(
+        select(Transaction.currency, month.label("month"), func.sum(Transaction.amount))
+        .where(Transaction.user_id == user_id, Transaction.category_id == category_id)
+        .group_by(Transaction.currency, "month")
+        # Transactions of a just deleted category are hidden otherwise
+        .execution_options(include_deleted=True)
+    ).all()
+    changes = []
+    for currency, month_date, amount in totals:
+        if old_type:
+            changes.append(
+                TransactionChange(old_type, category_id, currency, month_date, -amount)
+            )
+        if new_type:
+            changes.append(
+                TransactionChange(new_type, category_id, currency, month_date, amount)
+            )
+    await apply_transaction_changes(db, user_id, changes)
+
+
+async def create_transaction(
+    db: DBSession, user_id: int, category_id: int, data: Dict
+) -> Optional[Row]:
+    """Insert transaction in user's default currency with one
+    INSERT ... SELECT from the owned category, aggregates are fed from
+    RETURNING. None when the category is not found"""
+    table = Transaction.__table__
+    values = {
+        "user_id": Category.user_id,
+        "category_id": Category.id,
+        "currency": UserSettings.default_currency,
+        **{name: literal(value, table.c[name].type) for name, value in data.items()},
+    }
+    inserted = (
+        insert(table)
+        .from_select(
+            list(values),
+            select(*values.values())
+            .join(UserSettings, UserSettings.user_id == Category.user_id)
+            .where(
+                Category.id == category_id,
+                Category.user_id == user_id,
+                Category.deleted_at.is_(None),
+            ),
+        )
+        .returning(*table.c)
+        .cte("inserted")
+    )
+    row = db.execute(
+        select(inserted, Category.type.label("category_type")).join(
+            Category, Category.id == inserted.c.category_id
+        )
+    ).one_or_none()
+    if row:
+        await apply_transaction_changes(
+            db,
+            user_id,
+            [
+                TransactionChange(
+                    row.category_type,
+                    row.category_id,
+                    row.currency,
+                    row.date,
+                    row.amount,
+                )
+            ],
+        )
+    return row
+
+
+async def update_transaction(
+    db: DBSession, user_id: int, transaction_id: int, data: Dict
+) -> Optional[Row]:
+    """Update owned transaction with one UPDATE ... FROM, previous values
+    come from a locked subquery so aggregates can be corrected.
+    None when the transaction is not found"""
+    table = Transaction.__table__
+    old = (
+        select(table.c.id, table.c.amount, table.c.date)
+        .where(table.c.id == transaction_id, table.c.user_id == user_id)
+        .with_for_update()
+        .subquery("old")
+    )
+    row = db.execute(
+        update(table)
+        .where(
+            table.c.id == old.c.id,
+            Category.id == table.c.category_id,
+            Category.deleted_at.is_(None),
+        )
+        .values(**data)
+        .returning(
+            *table.c,
+            old.c.amount.label("old_amount"),
+            old.c.date.label("old_date"),
+            Category.type.label("category_type"),
+        )
+    ).one_or_none()
+    if row:
+        removed = TransactionChange(
+            row.category_type,
+            row.category_id,
+            row.currency,
+            row.old_date,
+            -row.old_amount,
+        )
+        added = TransactionChange(
+            row.category_type, row.category_id, row.currency, row.date, row.amount
+        )
+        await apply_transaction_changes(db, user_id, [removed, added])
+    return row
+
+
+async def bulk_delete_transactions(db: DBSession, user_id: int, criteria: List) -> int:
+    """Delete transactions matching criteria in one DELETE ... USING category,
+    RETURNING feeds the removed rows into aggregates.
+    Core table statement, ORM-enabled DML drops RETURNING columns
+    of other tables, so soft-deleted categories are excluded explicitly"""
+    rows = db.execute(
+        delete(Transaction.__table__)
+        .where(
+            Transaction.category_id == Category.id,
+            Category.deleted_at.is_(None),
+            *criteria,
+        )
+        .returning(
+            Category.type,
+            Category.id,
+            Transaction.currency,
+            Transaction.date,
+            Transaction.amount,
+        )
+    ).all()
+    await apply_transaction_changes(
+        db,
+        user_id,
+        [
+            TransactionChange(category_type, old_id, currency, date_, -amount)
+            for category_type, old_id, currency, date_, amount in rows
+        ],
+    )
+    return len(rows)
+
+
+async def bulk_move_transactions(
+    db: DBSession, user_id: int, criteria: List, category_id: int, category_type: str
+) -> int:
+    """Move transactions matching criteria to category in one
+    UPDATE ... FROM category, the joined category is the one rows left"""
+    rows = db.execute(
+        update(Transaction.__table__)
+        .where(
+            Transaction.category_id == Category.id,
+            Transaction.category_id != category_id,
+            Category.deleted_at.is_(None),
+            *criteria,
+        )
+        .values(category_id=category_id)
+        .returning(
+            Category.type,
+            Category.id,
+            Transaction.currency,
+            Transaction.date,
+            Transaction.amount,
+        )
+    ).all()
+    changes = []
+    for old_type, old_id, currency, date_, amount in rows:
+        changes.append(TransactionChange(old_type, old_id, currency, date_, -amount))
+        changes.append(
+            TransactionChange(category_type, category_id, currency, date_, amount)
+        )
+    await apply_transaction_changes(db, user_id, changes)
+    return len(rows)
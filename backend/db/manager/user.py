@@ -1,24 +1,50 @@
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 
-from db.models import User
+from sqlalchemy import Select, bindparam, select
+
+from db.models import User, UserSettings
 from db.session import DBSession
 from service.core.security import set_password_hash
 
 
 async def instance_exist(db: DBSession, model, **kwargs) -> bool:
     """Obtain Model name, fields as kwargs and check exist Instance or not"""
-    is_exist = db.query(db.query(model).filter_by(**kwargs).exists()).scalar()
+    # Rows pending purge still hold their unique values
+    is_exist = (
+        db.query(db.query(model).filter_by(**kwargs).exists())
+        .execution_options(include_deleted=True)
+        .scalar()
+    )
     return is_exist
 
 
+_default_currency = select(UserSettings.default_currency).where(
+    UserSettings.user_id == bindparam("user_id")
+)
+
+
+@lru_cache(maxsize=None)
+def _user_by(fields: Tuple[str, ...]) -> Select:
+    """One statement per set of lookup fields, built on first use"""
+    return select(User).where(
+        *(getattr(User, field) == bindparam(field) for field in fields)
+    )
+
+
 async def get_user(db: DBSession, **kwargs) -> Optional[User]:
     """Obtain fields as kwargs and return active User instance or None"""
-    user = db.query(User).filter_by(**kwargs).one_or_none()
+    user = db.execute(_user_by(tuple(sorted(kwargs))), kwargs).scalar_one_or_none()
     if not user:
         return
     return user
 
 
+async def get_default_currency(db: DBSession, user_id: int) -> Optional[str]:
+    """Default currency from user settings"""
+    return db.execute(_default_currency, {"user_id": user_id}).scalar()
+
+
 async def create_user(db: DBSession, user_data: Dict, **kwargs) -> Optional[User]:
     """Obtain new User fields, check exist User, set hash password and save"""
     exist = await instance_exist(db, model=User, email=user_data["email"])
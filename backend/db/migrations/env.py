@@ -5,7 +5,12 @@ from alembic import context
 from sqlalchemy import engine_from_config, pool
 
 from db.base import Base
+from db.models.balance import UserBalance  # noqa
+from db.models.budget import Budget, BudgetSpending  # noqa
 from db.models.category import Category  # noqa
+from db.models.exchange_rate import ExchangeRate  # noqa
+from db.models.job import Job  # noqa
+from db.models.rate_limit import RateLimitBucket  # noqa
 from db.models.transaction import Transaction  # noqa
 from db.models.user import Device, User, UserSettings  # noqa
 
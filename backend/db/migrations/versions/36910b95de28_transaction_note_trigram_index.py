@@ -0,0 +1,57 @@
+"""transaction note trigram index
+
+Revision ID: 36910b95de28
+Revises: 96c5ed9fbb90
+Create Date: 2026-10-18 13:05:47.220194
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "36910b95de28"
+down_revision: Union[str, None] = "96c5ed9fbb90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Concurrent builds don't block writes to transaction, they can't run
+    # inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transaction_note_trgm",
+            "transaction",
+            ["note"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"note": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_transaction_note_btree",
+            table_name="transaction",
+            postgresql_using="btree",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transaction_note_btree",
+            "transaction",
+            ["note"],
+            unique=False,
+            postgresql_using="btree",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_transaction_note_trgm",
+            table_name="transaction",
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
@@ -1,6 +1,14 @@
+from db.models.balance import UserBalance
+from db.models.budget import OVERALL_CATEGORY_ID, Budget, BudgetSpending
 from db.models.category import Category
 from db.models.constants import (PASSWORD_MAX, PASSWORD_MIN, CategoryTypeEnum,
-                                 CurrencyEnum, JWTType, SearchTypeEnum)
+                                 CurrencyEnum, JobStatusEnum, JobTypeEnum,
+                                 JWTType, PageCountEnum, SearchTypeEnum,
+                                 SeriesPeriodEnum)
+from db.models.exchange_rate import ExchangeRate
+from db.models.job import Job
+from db.models.rate_limit import RateLimitBucket
+from db.models.soft_delete import hide_soft_deleted  # noqa, registers listener
 from db.models.transaction import Transaction
 from db.models.user import Device, User, UserSettings
 
@@ -10,10 +18,21 @@ __all__ = (
     "Device",
     "Category",
     "Transaction",
+    "ExchangeRate",
+    "UserBalance",
+    "Job",
+    "RateLimitBucket",
+    "Budget",
+    "BudgetSpending",
+    "OVERALL_CATEGORY_ID",
     "PASSWORD_MAX",
     "PASSWORD_MIN",
     "JWTType",
     "CategoryTypeEnum",
     "CurrencyEnum",
     "SearchTypeEnum",
+    "SeriesPeriodEnum",
+    "JobTypeEnum",
+    "JobStatusEnum",
+    "PageCountEnum",
 )
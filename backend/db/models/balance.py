@@ -0,0 +1,37 @@
+from sqlalchemy import (DECIMAL, VARCHAR, BigInteger, Column, Date, DateTime,
+                        ForeignKey, Index, func)
+
+from db.base import Base
+
+
+class UserBalance(Base):
+    id = Column(BigInteger, primary_key=True, doc="Unique id")
+    user_id = Column(
+        BigInteger,
+        ForeignKey("user.id", ondelete="CASCADE"),
+        nullable=False,
+        doc="User id",
+    )
+    currency = Column(VARCHAR, nullable=False, doc="Balance currency")
+    month = Column(Date, nullable=False, doc="First day of the month")
+    amount = Column(
+        DECIMAL, nullable=False, default=0, doc="Balance at the end of the month"
+    )
+    created_at = Column(
+        DateTime(timezone=False),
+        default=func.now(),
+        server_default=func.now(),
+        nullable=False,
+        doc="Created at",
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_user_balance_user_id_currency_month_btree",
+            user_id,
+            currency,
+            month,
+            unique=True,
+            postgresql_using="btree",
+        ),
+    )
@@ -0,0 +1,68 @@
+from sqlalchemy import (DECIMAL, VARCHAR, BigInteger, Column, Date, DateTime,
+                        ForeignKey, Index, func, text)
+
+from db.base import Base
+
+# category_id of BudgetSpending rows counting all expense categories
+OVERALL_CATEGORY_ID = 0
+
+
+class Budget(Base):
+    id = Column(BigInteger, primary_key=True, doc="Unique id")
+    user_id = Column(
+        BigInteger,
+        ForeignKey("user.id", ondelete="CASCADE"),
+        nullable=False,
+        doc="User id",
+    )
+    category_id = Column(
+        BigInteger,
+        ForeignKey("category.id", ondelete="CASCADE"),
+        doc="Expense category id, empty for overall budget",
+    )
+    currency = Column(VARCHAR, nullable=False, doc="Budget currency")
+    amount = Column(DECIMAL, nullable=False, doc="Monthly limit")
+    created_at = Column(
+        DateTime(timezone=False),
+        default=func.now(),
+        server_default=func.now(),
+        nullable=False,
+        doc="Created at",
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_budget_user_id_category_id_btree",
+            user_id,
+            category_id,
+            unique=True,
+            postgresql_using="btree",
+            postgresql_where=text("category_id IS NOT NULL"),
+        ),
+        Index(
+            "ix_budget_user_id_overall_btree",
+            user_id,
+            unique=True,
+            postgresql_using="btree",
+            postgresql_where=text("category_id IS NULL"),
+        ),
+    )
+
+
+class BudgetSpending(Base):
+    """Expenses per category and month, maintained on transaction writes"""
+
+    user_id = Column(
+        BigInteger,
+        ForeignKey("user.id", ondelete="CASCADE"),
+        primary_key=True,
+        doc="User id",
+    )
+    category_id = Column(
+        BigInteger,
+        primary_key=True,
+        doc="Category id, OVERALL_CATEGORY_ID for all categories",
+    )
+    currency = Column(VARCHAR, primary_key=True, doc="Expense currency")
+    month = Column(Date, primary_key=True, doc="First day of the month")
+    amount = Column(DECIMAL, nullable=False, default=0, doc="Spent in the month")
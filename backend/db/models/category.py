@@ -23,10 +23,20 @@ class Category(Base):
         nullable=False,
         doc="Created at",
     )
+    deleted_at = Column(
+        DateTime(timezone=False),
+        doc="Marked as deleted at, rows are purged in background",
+    )
     transaction = relationship("Transaction", back_populates="category", lazy="noload")
     user = relationship("User", back_populates="category", lazy="joined")
 
     __table_args__ = (
         Index("ix_category_title_btree", title, postgresql_using="btree"),
         Index("ix_category_description_btree", description, postgresql_using="btree"),
+        Index(
+            "ix_category_deleted_at_btree",
+            deleted_at,
+            postgresql_using="btree",
+            postgresql_where=deleted_at.isnot(None),
+        ),
     )
@@ -29,3 +29,26 @@ class SearchTypeEnum(Enum):
     MONTH = "MONTH"
     YEAR = "YEAR"
     INTERVAL = "INTERVAL"
+
+
+class SeriesPeriodEnum(Enum):
+    DAY = "DAY"
+    WEEK = "WEEK"
+    MONTH = "MONTH"
+
+
+class JobTypeEnum(Enum):
+    CURRENCY_CONVERSION = "CURRENCY_CONVERSION"
+
+
+class JobStatusEnum(Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCESS = "SUCCESS"
+    FAILURE = "FAILURE"
+
+
+class PageCountEnum(Enum):
+    NONE = "NONE"
+    ESTIMATE = "ESTIMATE"
+    EXACT = "EXACT"
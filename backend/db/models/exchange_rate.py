@@ -0,0 +1,30 @@
+from sqlalchemy import (DECIMAL, VARCHAR, BigInteger, Column, Date, DateTime,
+                        Index, func)
+
+from db.base import Base
+
+
+class ExchangeRate(Base):
+    id = Column(BigInteger, primary_key=True, doc="Unique id")
+    base_currency = Column(VARCHAR, nullable=False, doc="Currency to convert from")
+    quote_currency = Column(VARCHAR, nullable=False, doc="Currency to convert to")
+    rate = Column(DECIMAL, nullable=False, doc="Quote currency units per base unit")
+    date = Column(Date, nullable=False, doc="Rate date")
+    created_at = Column(
+        DateTime(timezone=False),
+        default=func.now(),
+        server_default=func.now(),
+        nullable=False,
+        doc="Created at",
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_exchange_rate_pair_date_btree",
+            base_currency,
+            quote_currency,
+            date,
+            unique=True,
+            postgresql_using="btree",
+        ),
+    )
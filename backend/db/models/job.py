@@ -0,0 +1,60 @@
+from sqlalchemy import (VARCHAR, BigInteger, Boolean, Column, DateTime,
+                        ForeignKey, Index, Integer, false, func)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+
+from db.base import Base
+from db.models import constants
+
+
+class Job(Base):
+    id = Column(BigInteger, primary_key=True, doc="Unique id")
+    user_id = Column(
+        BigInteger,
+        ForeignKey("user.id", ondelete="CASCADE"),
+        nullable=False,
+        doc="User id",
+    )
+    type = Column(VARCHAR, nullable=False, doc="Job type")
+    status = Column(
+        VARCHAR,
+        nullable=False,
+        default=constants.JobStatusEnum.PENDING.value,
+        server_default=constants.JobStatusEnum.PENDING.value,
+        doc="Job status",
+    )
+    params = Column(JSONB, nullable=False, doc="Job input")
+    published = Column(
+        Boolean(),
+        nullable=False,
+        default=False,
+        server_default=false(),
+        doc="Job tasks are accepted by the broker",
+    )
+    total_shards = Column(Integer, nullable=False, default=1, doc="Shards count")
+    completed_shards = Column(
+        ARRAY(Integer),
+        nullable=False,
+        default=[],
+        server_default="{}",
+        doc="Indexes of finished shards",
+    )
+    result = Column(JSONB, doc="Job result")
+    error = Column(VARCHAR, doc="Failure reason")
+    created_at = Column(
+        DateTime(timezone=False),
+        default=func.now(),
+        server_default=func.now(),
+        nullable=False,
+        doc="Created at",
+    )
+    updated_at = Column(
+        DateTime(timezone=False),
+        default=func.now(),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+        doc="Updated at",
+    )
+    finished_at = Column(DateTime(timezone=False), doc="Finished at")
+
+    __table_args__ = (Index("ix_job_user_id_btree", user_id, postgresql_using="btree"),)
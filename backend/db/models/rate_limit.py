@@ -0,0 +1,12 @@
+from sqlalchemy import VARCHAR, Column, DateTime, Float
+
+from db.base import Base
+
+
+class RateLimitBucket(Base):
+    key = Column(VARCHAR, primary_key=True, doc="User or client key")
+    tokens = Column(Float, nullable=False, doc="Tokens left at updated_at")
+    updated_at = Column(DateTime(timezone=True), nullable=False, doc="Updated at")
+
+    # Buckets are disposable, skip WAL
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
@@ -0,0 +1,46 @@
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, with_loader_criteria
+
+from db.models.category import Category
+from db.models.transaction import Transaction
+from db.models.user import User
+
+category_table = Category.__table__
+
+
+def soft_delete_criteria():
+    """Loader criteria hiding users and categories marked as deleted,
+    and transactions of deleted categories"""
+    return (
+        with_loader_criteria(
+            User, lambda cls: cls.deleted_at.is_(None), include_aliases=True
+        ),
+        with_loader_criteria(
+            Category, lambda cls: cls.deleted_at.is_(None), include_aliases=True
+        ),
+        # Core table, so the subquery itself isn't filtered.
+        # Few categories are pending purge at a time, the partial index
+        # ix_category_deleted_at_btree keeps this an anti-join on a tiny set
+        with_loader_criteria(
+            Transaction,
+            lambda cls: cls.category_id.notin_(
+                select(category_table.c.id).where(
+                    category_table.c.deleted_at.isnot(None)
+                )
+            ),
+            include_aliases=True,
+        ),
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def hide_soft_deleted(execute_state):
+    """Hide soft deleted rows from every ORM statement until they are
+    purged. Pass `include_deleted=True` execution option to see them"""
+    if (
+        execute_state.is_column_load
+        or execute_state.is_relationship_load
+        or execute_state.execution_options.get("include_deleted", False)
+    ):
+        return
+    execute_state.statement = execute_state.statement.options(*soft_delete_criteria())
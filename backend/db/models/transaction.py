@@ -43,5 +43,20 @@ class Transaction(Base):
         Index("ix_transaction_amount_btree", amount, postgresql_using="btree"),
         Index("ix_transaction_currency_btree", currency, postgresql_using="btree"),
         Index("ix_transaction_date_btree", date, postgresql_using="btree"),
-        Index("ix_transaction_note_btree", note, postgresql_using="btree"),
+        Index(
+            "ix_transaction_category_id_btree", category_id, postgresql_using="btree"
+        ),
+        Index(
+            "ix_transaction_note_trgm",
+            note,
+            postgresql_using="gin",
+            postgresql_ops={"note": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_transaction_user_id_date_id_btree",
+            user_id,
+            date,
+            id,
+            postgresql_using="btree",
+        ),
     )
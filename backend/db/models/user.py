@@ -21,6 +21,10 @@ class User(Base):
         nullable=False,
         doc="Created at",
     )
+    deleted_at = Column(
+        DateTime(timezone=False),
+        doc="Marked as deleted at, rows are purged in background",
+    )
     settings = relationship(
         "UserSettings",
         backref="user",
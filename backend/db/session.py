@@ -1,4 +1,7 @@
-from sqlalchemy import create_engine
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, default
 from sqlalchemy.orm import scoped_session, sessionmaker
 
 from service.core import settings
@@ -9,3 +12,40 @@ engine = create_engine(
     echo=False,
 )
 DBSession = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+
+
+class StatementCacheStats:
+    """Compiled cache lookups of statements executed by this process"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        lookups = self.hits + self.misses
+        return round(self.hits / lookups, 4) if lookups else None
+
+    def as_dict(self) -> Dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncached": self.uncached,
+            "hit_ratio": self.hit_ratio,
+        }
+
+
+statement_cache_stats = StatementCacheStats()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def count_statement_cache(conn, cursor, statement, parameters, context, executemany):
+    cache_hit = getattr(context, "cache_hit", None)
+    if cache_hit is default.CACHE_HIT:
+        statement_cache_stats.hits += 1
+    elif cache_hit is default.CACHE_MISS:
+        statement_cache_stats.misses += 1
+    else:
+        # Plain SQL text and DDL are not cached
+        statement_cache_stats.uncached += 1
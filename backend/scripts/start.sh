@@ -13,5 +13,11 @@ export WORKER_CLASS=${WORKER_CLASS:-"uvicorn.workers.UvicornWorker"}
 # If there's a prestart.sh script in the /app directory or other path specified, run it before starting
 PRE_START_PATH=${PRE_START_PATH:-/backend/scripts/prestart.sh}
 . "$PRE_START_PATH"
+# Code reload can't refresh an application preloaded in the master
+RELOAD_FLAG="--reload"
+# Same values as preload_app in gunicorn_config.py, in any case
+case "$(echo "${PRELOAD_APP:-false}" | tr '[:upper:]' '[:lower:]')" in
+    1|true|yes) RELOAD_FLAG="" ;;
+esac
 # Start Gunicorn
-exec gunicorn -k "$WORKER_CLASS" -c "$GUNICORN_CONF" "$APP_MODULE" --reload
+exec gunicorn -k "$WORKER_CLASS" -c "$GUNICORN_CONF" "$APP_MODULE" $RELOAD_FLAG
@@ -1,4 +1,4 @@
 #! /usr/bin/env bash
 set -e
 
-celery -A workers.celery_tasks worker -l info -Q currency-queue
\ No newline at end of file
+celery -A workers.celery_tasks worker -l info -Q currency-queue,maintenance-queue,notification-queue
\ No newline at end of file
@@ -2,7 +2,11 @@ from fastapi import APIRouter
 from fastapi_pagination import add_pagination
 
 from .auth import auth
+from .budget import budget
 from .category import category
+from .exchange_rate import exchange_rate
+from .job import job
+from .metrics import metrics
 from .transaction import transaction
 from .user import user
 
@@ -14,5 +18,11 @@ root_router.include_router(category.router, tags=["category"], prefix="/category
 root_router.include_router(
     transaction.router, tags=["transaction"], prefix="/transaction"
 )
+root_router.include_router(
+    exchange_rate.router, tags=["exchange rate"], prefix="/exchange-rate"
+)
+root_router.include_router(job.router, tags=["job"], prefix="/jobs")
+root_router.include_router(budget.router, tags=["budget"], prefix="/budget")
+root_router.include_router(metrics.router, tags=["metrics"], prefix="/metrics")
 
 add_pagination(root_router)
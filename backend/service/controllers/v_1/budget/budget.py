@@ -0,0 +1,85 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import UJSONResponse
+from pydantic import PositiveInt
+
+from db import manager
+from db.session import DBSession
+from service.core.dependencies import get_current_user_id, get_db
+from service.schemas import v_1 as schemas_v_1
+
+router = APIRouter()
+
+
+@router.put(
+    "/",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas_v_1.Budget,
+)
+async def save_budget(
+    input_data: schemas_v_1.BudgetCreate,
+    db: DBSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
+) -> UJSONResponse:
+    """
+    Create or overwrite monthly limit of expense category or overall \n
+    JSON data \n
+    `category_id`: Optional[PositiveInt] - overall budget without it \n
+    `currency`: CurrencyEnum \n
+    `amount`: PositiveFloat \n
+    Responses: \n
+    `200` OK \n
+    `404` NOT FOUND - Expense category not found \n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation
+    """
+    budget = await manager.save_budget(db, current_user_id, input_data.model_dump())
+    if not budget:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Expense category not found",
+        )
+    db.commit()
+    return budget
+
+
+@router.get(
+    "/",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas_v_1.BudgetsUsage,
+)
+async def get_my_budgets(
+    db: DBSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
+) -> UJSONResponse:
+    """
+    Get my budgets with spending of the current month \n
+    Responses: \n
+    `200` OK
+    """
+    month = date.today().replace(day=1)
+    budgets = await manager.get_budgets_usage(db, current_user_id, month)
+    return {"month": month, "items": budgets}
+
+
+@router.delete("/{budget_id}")
+async def delete_budget(
+    budget_id: PositiveInt,
+    db: DBSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
+) -> UJSONResponse:
+    """
+    Delete budget \n
+    PATH params \n
+    `budget_id`: PositiveInt \n
+    Responses: \n
+    `204` NO CONTENT \n
+    `404` NOT FOUND - Budget not found
+    """
+    if not await manager.delete_budget(db, current_user_id, budget_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Budget not found",
+        )
+    db.commit()
+    return status.HTTP_204_NO_CONTENT
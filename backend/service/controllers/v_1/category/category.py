@@ -3,20 +3,20 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import UJSONResponse
-from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
 from pydantic import PositiveInt
-from sqlalchemy import and_, exists
 from sqlalchemy.orm import joinedload
 
-from db import models
+from db import manager, models
 from db.session import DBSession
 from service.core.dependencies import get_current_user, get_db
+from service.core.pagination import LimitPage, paginate
+from service.core.routing import SingleFlightRoute, single_flight
 from service.schemas import v_1 as schemas_v_1
+from workers.publisher import publisher
 
 from ..utils import category_tr_filter_search, search_enum_check
 
-router = APIRouter()
+router = APIRouter(route_class=SingleFlightRoute)
 
 
 @router.post(
@@ -40,22 +40,14 @@ async def create_category(
     `400` BAD REQUEST - Category already exists in your list \n
     `422` UNPROCESSABLE_ENTITY - Failed field validation
     """
-    category_exists = db.query(
-        exists().where(
-            and_(
-                models.Category.title == input_data.title,
-                models.Category.user_id == current_user.id,
-                models.Category.type == input_data.type,
-            )
-        )
-    ).scalar()
-    if category_exists:
+    category = await manager.create_category(
+        db, current_user.id, input_data.model_dump()
+    )
+    if not category:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You have already created such category",
         )
-    category = models.Category(user_id=current_user.id, **input_data.model_dump())
-    db.add(category)
     db.commit()
     return category
 
@@ -84,16 +76,19 @@ async def create_category(
     `404` NOT FOUND - Returns if Category not found \n
     `422` UNPROCESSABLE_ENTITY - Failed field validation
     """
-    category = db.query(models.Category).filter(
-        models.Category.id == category_id, models.Category.user_id == current_user.id
+    category = await manager.update_category(
+        db, current_user.id, category_id, input_data.model_dump()
     )
-    if not category.one_or_none():
+    if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found",
         )
-    category.update({**input_data.model_dump()})
-    category = category.one()
+    if category.type != category.old_type:
+        await manager.move_category_aggregates(
+            db, current_user.id, category_id, category.old_type, category.type
+        )
+    db.commit()
     return category
 
 
@@ -104,7 +99,7 @@ async def delete_category(
     current_user: models.User = Depends(get_current_user),
 ) -> UJSONResponse:
     """
-    Delete category \n
+    Delete category, its transactions are purged in background \n
     PATH params \n
     category_id: PositiveInt \n
     Responses: \n
@@ -112,24 +107,28 @@ async def delete_category(
     `404` NOT FOUND - Returns if Category not found \n
     `422` UNPROCESSABLE_ENTITY - Failed field validation
     """
-    category = db.query(models.Category).filter(
-        models.Category.id == category_id, models.Category.user_id == current_user.id
-    )
-    if not category.one_or_none():
+    category_type = await manager.soft_delete_category(db, current_user.id, category_id)
+    if not category_type:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found",
         )
-    category.delete()
+    await manager.move_category_aggregates(
+        db, current_user.id, category_id, category_type, None
+    )
     db.commit()
+    await publisher.apply_async(
+        publisher.signature("workers.celery_tasks.purge_category", args=[category_id])
+    )
     return status.HTTP_204_NO_CONTENT
 
 
 @router.get(
     "/",
     status_code=status.HTTP_200_OK,
-    response_model=Page[schemas_v_1.CategoryTransactions],
+    response_model=LimitPage[schemas_v_1.CategoryTransactions],
 )
+@single_flight
 async def get_my_categories(
     db: DBSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
@@ -141,7 +140,6 @@ async def get_my_categories(
     """
     my_categories = (
         db.query(models.Category)
-        .outerjoin(models.Transaction)
         .filter(models.Category.user_id == current_user.id)
         .options(joinedload(models.Category.transaction))
     )
@@ -151,8 +149,9 @@ async def get_my_categories(
 @router.get(
     "/my/expense",
     status_code=status.HTTP_200_OK,
-    response_model=Page[schemas_v_1.CategoryTransactions],
+    response_model=LimitPage[schemas_v_1.CategoryTransactions],
 )
+@single_flight
 async def get_my_expense_categories(
     db: DBSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
@@ -176,8 +175,9 @@ async def get_my_expense_categories(
 @router.get(
     "/my/income",
     status_code=status.HTTP_200_OK,
-    response_model=Page[schemas_v_1.CategoryTransactions],
+    response_model=LimitPage[schemas_v_1.CategoryTransactions],
 )
+@single_flight
 async def get_my_income_categories(
     db: DBSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
@@ -236,8 +236,9 @@ async def get_my_category_by_id(
 @router.get(
     "/transaction/filter",
     status_code=status.HTTP_200_OK,
-    response_model=Page[schemas_v_1.CategoryTransactions],
+    response_model=LimitPage[schemas_v_1.CategoryTransactions],
 )
+@single_flight
 async def get_my_transactions_by_filter(
     search_type: str,
     start_date: Optional[date] = None,
@@ -265,8 +266,9 @@ async def get_my_transactions_by_filter(
 @router.get(
     "/expense/transaction/filter",
     status_code=status.HTTP_200_OK,
-    response_model=Page[schemas_v_1.CategoryTransactions],
+    response_model=LimitPage[schemas_v_1.CategoryTransactions],
 )
+@single_flight
 async def get_my_transactions_by_filter(
     search_type: str,
     start_date: Optional[date] = None,
@@ -294,8 +296,9 @@ async def get_my_transactions_by_filter(
 @router.get(
     "/income/transaction/filter",
     status_code=status.HTTP_200_OK,
-    response_model=Page[schemas_v_1.CategoryTransactions],
+    response_model=LimitPage[schemas_v_1.CategoryTransactions],
 )
+@single_flight
 async def get_my_transactions_by_filter(
     search_type: str,
     start_date: Optional[date] = None,
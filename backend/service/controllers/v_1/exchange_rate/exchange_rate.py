@@ -0,0 +1,79 @@
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import UJSONResponse
+
+from db import manager, models
+from db.session import DBSession
+from service.core.dependencies import (get_current_superuser, get_current_user,
+                                       get_db)
+from service.schemas import v_1 as schemas_v_1
+
+router = APIRouter()
+
+
+@router.post(
+    "/",
+    status_code=status.HTTP_201_CREATED,
+    response_model=schemas_v_1.ExchangeRate,
+)
+async def create_exchange_rate(
+    input_data: schemas_v_1.ExchangeRateCreate,
+    db: DBSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_superuser),
+) -> UJSONResponse:
+    """
+    Create or overwrite exchange rate of currency pair on date \n
+    JSON data \n
+    `base_currency`: CurrencyEnum \n
+    `quote_currency`: CurrencyEnum \n
+    `rate`: PositiveFloat \n
+    `date`: date \n
+    Responses: \n
+    `201` CREATED \n
+    `403` FORBIDDEN - Not enough permissions \n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation
+    """
+    rate = await manager.save_exchange_rate(db, input_data.model_dump())
+    db.commit()
+    return rate
+
+
+@router.get(
+    "/",
+    status_code=status.HTTP_200_OK,
+    response_model=List[schemas_v_1.ExchangeRate],
+)
+async def get_exchange_rates(
+    base_currency: models.CurrencyEnum,
+    quote_currency: models.CurrencyEnum,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: DBSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> UJSONResponse:
+    """
+    Get exchange rates of currency pair \n
+    QUERY params \n
+    `base_currency`: CurrencyEnum \n
+    `quote_currency`: CurrencyEnum \n
+    `start_date`: Optional[date] \n
+    `end_date`: Optional[date] \n
+    Responses: \n
+    `200` OK \n
+    `400` BAD REQUEST - Wrong filter
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Wrong filter"
+        )
+    rates = db.query(models.ExchangeRate).filter(
+        models.ExchangeRate.base_currency == base_currency.value,
+        models.ExchangeRate.quote_currency == quote_currency.value,
+    )
+    if start_date:
+        rates = rates.filter(models.ExchangeRate.date >= start_date)
+    if end_date:
+        rates = rates.filter(models.ExchangeRate.date <= end_date)
+    return rates.order_by(models.ExchangeRate.date).all()
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import UJSONResponse
+from pydantic import PositiveInt
+
+from db import manager
+from db.session import DBSession
+from service.core.dependencies import get_current_user_id, get_db
+from service.schemas import v_1 as schemas_v_1
+
+router = APIRouter()
+
+
+@router.get(
+    "/{job_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas_v_1.Job,
+)
+async def get_job(
+    job_id: PositiveInt,
+    response: Response,
+    db: DBSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
+) -> UJSONResponse:
+    """
+    Get background job status \n
+    PATH params \n
+    `job_id`: int \n
+    Responses: \n
+    `200` OK \n
+    `404` NOT FOUND - Job not found
+    """
+    job = await manager.get_job_status(db, job_id, current_user_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+    response.headers["Cache-Control"] = "no-store"
+    return job
@@ -0,0 +1,32 @@
+import os
+
+from fastapi import APIRouter, Depends, Response, status
+from fastapi.responses import UJSONResponse
+
+from db import models
+from db.session import statement_cache_stats
+from service.core.dependencies import get_current_superuser
+from service.core.middleware import skip_compression
+from service.schemas import v_1 as schemas_v_1
+
+router = APIRouter()
+
+
+@router.get(
+    "/",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas_v_1.Metrics,
+)
+@skip_compression
+async def get_metrics(
+    response: Response,
+    current_user: models.User = Depends(get_current_superuser),
+) -> UJSONResponse:
+    """
+    Get metrics of the worker process that served the request \n
+    Responses: \n
+    `200` OK \n
+    `403` FORBIDDEN - Not enough permissions
+    """
+    response.headers["Cache-Control"] = "no-store"
+    return {"pid": os.getpid(), "statement_cache": statement_cache_stats.as_dict()}
@@ -1,23 +1,143 @@
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import UJSONResponse
-from fastapi_pagination import Page
-from fastapi_pagination.ext.sqlalchemy import paginate
 from pydantic import PositiveInt
-from sqlalchemy import and_, exists
 from sqlalchemy.orm import joinedload
 
-from db import models
+from db import manager, models
 from db.session import DBSession
+from service.core import settings
 from service.core.dependencies import get_current_user, get_db
+from service.core.pagination import LimitPage, paginate
+from service.core.routing import SingleFlightRoute, single_flight
 from service.schemas import v_1 as schemas_v_1
-from workers.celery_app import celery_app
+from workers.publisher import publisher
 
-from ..utils import search_enum_check, transactions_filter_search
+from ..utils import (search_enum_check, split_date_range,
+                     transactions_bulk_criteria, transactions_by_ids,
+                     transactions_daily_totals, transactions_filter_search,
+                     transactions_query, transactions_search,
+                     transactions_series)
 
-router = APIRouter()
+router = APIRouter(route_class=SingleFlightRoute)
+
+
+@router.get(
+    "/batch",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas_v_1.TransactionBatch,
+)
+async def get_transactions_batch(
+    ids: List[PositiveInt] = Query(
+        ..., min_length=1, max_length=settings.TRANSACTION_BATCH_MAX_IDS
+    ),
+    db: DBSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> UJSONResponse:
+    """
+    Get my transactions by id list \n
+    QUERY params \n
+    `ids`: List[PositiveInt] - repeated, use POST for long lists \n
+    Responses: \n
+    `200` OK - transactions in requested order, not found ids in `missing` \n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation
+    """
+    items, missing = transactions_by_ids(db, current_user.id, ids)
+    return {"items": items, "missing": missing}
+
+
+@router.post(
+    "/batch",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas_v_1.TransactionBatch,
+)
+async def post_transactions_batch(
+    input_data: schemas_v_1.TransactionBatchRequest,
+    db: DBSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> UJSONResponse:
+    """
+    Get my transactions by id list \n
+    JSON data \n
+    `ids`: List[PositiveInt] \n
+    Responses: \n
+    `200` OK - transactions in requested order, not found ids in `missing` \n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation
+    """
+    items, missing = transactions_by_ids(db, current_user.id, input_data.ids)
+    return {"items": items, "missing": missing}
+
+
+@router.post(
+    "/bulk-delete",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas_v_1.TransactionBulkResult,
+)
+async def bulk_delete_transactions(
+    input_data: schemas_v_1.TransactionBulkSelection,
+    db: DBSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> UJSONResponse:
+    """
+    Delete my transactions by id list or by category filter \n
+    JSON data \n
+    `ids`: Optional[List[PositiveInt]] \n
+    `category_id`: Optional[PositiveInt] - instead of `ids` \n
+    `search_type`: Optional[SearchTypeEnum] - required with `category_id` \n
+    `start_date`: Optional[date] - for INTERVAL \n
+    `end_date`: Optional[date] - for INTERVAL \n
+    Responses: \n
+    `200` OK - deleted transactions count \n
+    `400` BAD REQUEST - Wrong filter \n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation
+    """
+    criteria = transactions_bulk_criteria(current_user.id, input_data)
+    affected = await manager.bulk_delete_transactions(db, current_user.id, criteria)
+    db.commit()
+    return {"affected": affected}
+
+
+@router.post(
+    "/bulk-recategorize",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas_v_1.TransactionBulkResult,
+)
+async def bulk_recategorize_transactions(
+    input_data: schemas_v_1.TransactionBulkRecategorize,
+    db: DBSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> UJSONResponse:
+    """
+    Move my transactions to another category by id list or by category filter \n
+    JSON data \n
+    `target_category_id`: PositiveInt \n
+    `ids`: Optional[List[PositiveInt]] \n
+    `category_id`: Optional[PositiveInt] - instead of `ids` \n
+    `search_type`: Optional[SearchTypeEnum] - required with `category_id` \n
+    `start_date`: Optional[date] - for INTERVAL \n
+    `end_date`: Optional[date] - for INTERVAL \n
+    Responses: \n
+    `200` OK - moved transactions count \n
+    `400` BAD REQUEST - Wrong filter \n
+    `404` NOT FOUND - Category not found \n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation
+    """
+    category_type = await manager.get_category_type(
+        db, current_user.id, input_data.target_category_id
+    )
+    if not category_type:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found",
+        )
+    criteria = transactions_bulk_criteria(current_user.id, input_data)
+    affected = await manager.bulk_move_transactions(
+        db, current_user.id, criteria, input_data.target_category_id, category_type
+    )
+    db.commit()
+    return {"affected": affected}
 
 
 @router.post(
@@ -44,33 +164,16 @@ async def create_transaction(
     `404` NOT FOUND - Category not found \n
     `422` UNPROCESSABLE_ENTITY - Failed field validation
     """
-    category_exists = db.query(
-        exists().where(
-            and_(
-                models.Category.id == category_id,
-                models.Category.user_id == current_user.id,
-            )
-        )
-    ).scalar()
-    if not category_exists:
+    transaction = await manager.create_transaction(
+        db, current_user.id, category_id, input_data.model_dump()
+    )
+    if not transaction:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found",
         )
-    us_currency = (
-        db.query(models.UserSettings.default_currency)
-        .filter(models.UserSettings.user_id == current_user.id)
-        .scalar()
-    )
-    transaction = models.Transaction(
-        user_id=current_user.id,
-        category_id=category_id,
-        currency=us_currency,
-        **input_data.model_dump()
-    )
-    db.add(transaction)
     db.commit()
-    return transaction
+    return {**transaction._mapping, "user": current_user}
 
 
 @router.put(
@@ -98,19 +201,16 @@ async def update_transaction(
     `404` NOT FOUND - Category or transaction not found \n
     `422` UNPROCESSABLE_ENTITY - Failed field validation
     """
-    transaction = db.query(models.Transaction).filter(
-        models.Transaction.id == transaction_id,
-        models.Transaction.user_id == current_user.id,
+    transaction = await manager.update_transaction(
+        db, current_user.id, transaction_id, input_data.model_dump()
     )
-    if not transaction.one_or_none():
+    if not transaction:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaction not found",
         )
-    transaction.update({**input_data.model_dump()})
     db.commit()
-    transaction = transaction.one()
-    return transaction
+    return {**transaction._mapping, "user": current_user}
 
 
 @router.delete("/{transaction_id}")
@@ -127,20 +227,248 @@ async def update_transaction(
     `204` NO CONTENT \n
     `404` NOT FOUND - Category not found \n
     """
-    transaction = db.query(models.Transaction).filter(
-        models.Transaction.id == transaction_id,
-        models.Transaction.user_id == current_user.id,
+    deleted = await manager.bulk_delete_transactions(
+        db,
+        current_user.id,
+        [
+            models.Transaction.id == transaction_id,
+            models.Transaction.user_id == current_user.id,
+        ],
     )
-    if not transaction.one_or_none():
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaction not found",
         )
-    transaction.delete()
     db.commit()
     return status.HTTP_204_NO_CONTENT
 
 
+@router.get(
+    "/series",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas_v_1.TransactionSeries,
+)
+@single_flight
+async def get_my_transactions_series(
+    period: models.SeriesPeriodEnum,
+    start_date: date,
+    end_date: date,
+    category_ids: Optional[List[PositiveInt]] = Query(None),
+    convert: bool = False,
+    db: DBSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> UJSONResponse:
+    """
+    Get my income and expense totals per day, week or month \n
+    QUERY params \n
+    `period`: SeriesPeriodEnum \n
+    `start_date`: date \n
+    `end_date`: date \n
+    `category_ids`: Optional[List[PositiveInt]] \n
+    `convert`: bool - convert amounts into my default currency \n
+    Responses: \n
+    `200` OK - rows without a rate are counted in `unconverted` \n
+    `400` BAD REQUEST - Wrong filter \n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation
+    """
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Wrong filter"
+        )
+    currency = current_user.settings.default_currency if convert else None
+    points = transactions_series(
+        db,
+        period.value,
+        current_user.id,
+        start_date,
+        end_date,
+        category_ids,
+        currency=currency,
+    )
+    return {
+        "period": period,
+        "start_date": start_date,
+        "end_date": end_date,
+        "currency": currency,
+        "unconverted": sum(point.unconverted for point in points),
+        "points": points,
+    }
+
+
+@router.get(
+    "/summary",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas_v_1.TransactionSummary,
+)
+@single_flight
+async def get_my_transactions_summary(
+    start_date: date,
+    end_date: date,
+    category_ids: Optional[List[PositiveInt]] = Query(None),
+    db: DBSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> UJSONResponse:
+    """
+    Get my income and expense totals converted into my default currency \n
+    QUERY params \n
+    `start_date`: date \n
+    `end_date`: date \n
+    `category_ids`: Optional[List[PositiveInt]] \n
+    Responses: \n
+    `200` OK \n
+    `400` BAD REQUEST - Wrong filter \n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation
+    """
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Wrong filter"
+        )
+    totals = transactions_daily_totals(
+        db, current_user.id, start_date, end_date, category_ids
+    )
+    currency = current_user.settings.default_currency
+    rates = await manager.get_rates_cache(db)
+    converted = rates.convert(
+        [total.amount for total in totals],
+        [total.currency for total in totals],
+        [total.date for total in totals],
+        currency,
+    )
+    summary = {"income": 0, "expense": 0, "unconverted": 0}
+    for total, amount in zip(totals, converted):
+        if amount is None:
+            summary["unconverted"] += 1
+        else:
+            summary["income" if total.is_income else "expense"] += amount
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "currency": currency,
+        **summary,
+    }
+
+
+@router.get(
+    "/search",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas_v_1.TransactionSearchPage,
+)
+@single_flight
+async def search_my_transactions(
+    q: str = Query(..., min_length=3, max_length=100),
+    category_ids: Optional[List[PositiveInt]] = Query(None),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: DBSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> UJSONResponse:
+    """
+    Search my transactions by note, most similar first \n
+    QUERY params \n
+    `q`: str - text the note contains, at least 3 characters \n
+    `category_ids`: Optional[List[PositiveInt]] \n
+    `start_date`: Optional[date] \n
+    `end_date`: Optional[date] \n
+    `limit`: int \n
+    `cursor`: Optional[str] - `next_cursor` of the previous page \n
+    Responses: \n
+    `200` OK \n
+    `400` BAD REQUEST - Wrong filter or cursor \n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Wrong filter"
+        )
+    rows, next_cursor = transactions_search(
+        db,
+        current_user.id,
+        q,
+        limit,
+        cursor=cursor,
+        category_ids=category_ids,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    items = [
+        {
+            **schemas_v_1.Transaction.model_validate(transaction).model_dump(),
+            "rank": rank,
+        }
+        for transaction, rank in rows
+    ]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get(
+    "/query",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas_v_1.TransactionQueryPage,
+)
+@single_flight
+async def query_my_transactions(
+    category_ids: Optional[List[PositiveInt]] = Query(None),
+    category_type: Optional[models.CategoryTypeEnum] = None,
+    currencies: Optional[List[models.CurrencyEnum]] = Query(None),
+    amount_min: Optional[float] = Query(None, ge=0),
+    amount_max: Optional[float] = Query(None, ge=0),
+    search_type: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    note: Optional[str] = Query(None, min_length=3, max_length=100),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: DBSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> UJSONResponse:
+    """
+    Query my transactions by any combination of filters, newest first \n
+    QUERY params \n
+    `category_ids`: Optional[List[PositiveInt]] \n
+    `category_type`: Optional[CategoryTypeEnum] \n
+    `currencies`: Optional[List[CurrencyEnum]] \n
+    `amount_min`: Optional[float] \n
+    `amount_max`: Optional[float] \n
+    `search_type`: Optional[str] - period, dates are used without it \n
+    `start_date`: Optional[date] - for INTERVAL \n
+    `end_date`: Optional[date] - for INTERVAL \n
+    `note`: Optional[str] - text the note contains, at least 3 characters \n
+    `limit`: int \n
+    `cursor`: Optional[str] - `next_cursor` of the previous page \n
+    Responses: \n
+    `200` OK \n
+    `400` BAD REQUEST - Wrong filter or cursor \n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation
+    """
+    if search_type:
+        search_enum_check(search_type, start_date, end_date)
+    if (start_date and end_date and start_date > end_date) or (
+        amount_min is not None and amount_max is not None and amount_min > amount_max
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Wrong filter"
+        )
+    transactions, next_cursor = transactions_query(
+        db,
+        current_user.id,
+        limit,
+        cursor=cursor,
+        category_ids=category_ids,
+        category_type=category_type and category_type.value,
+        currencies=currencies and [currency.value for currency in currencies],
+        amount_min=amount_min,
+        amount_max=amount_max,
+        search_type=search_type,
+        start_date=start_date,
+        end_date=end_date,
+        note=note,
+    )
+    return {"items": transactions, "next_cursor": next_cursor}
+
+
 @router.get(
     "/{transaction_id}",
     status_code=status.HTTP_200_OK,
@@ -180,7 +508,7 @@ async def get_transaction_by_id(
 @router.get(
     "/category/{category_id}",
     status_code=status.HTTP_200_OK,
-    response_model=Page[schemas_v_1.Transaction],
+    response_model=LimitPage[schemas_v_1.Transaction],
 )
 async def get_my_transactions_by_category(
     category_id: PositiveInt,
@@ -195,15 +523,8 @@ async def get_my_transactions_by_category(
     `201` CREATED \n
     `404` NOT FOUND - Category not found
     """
-    category_exists = db.query(
-        exists().where(
-            and_(
-                models.Category.id == category_id,
-                models.Category.user_id == current_user.id,
-            )
-        )
-    ).scalar()
-    if not category_exists:
+    category_type = await manager.get_category_type(db, current_user.id, category_id)
+    if not category_type:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found",
@@ -222,8 +543,9 @@ async def get_my_transactions_by_category(
 @router.get(
     "/category/{category_id}/filter",
     status_code=status.HTTP_200_OK,
-    response_model=Page[schemas_v_1.Transaction],
+    response_model=LimitPage[schemas_v_1.Transaction],
 )
+@single_flight
 async def get_my_transactions_by_filter(
     category_id: PositiveInt,
     search_type: str,
@@ -246,15 +568,8 @@ async def get_my_transactions_by_filter(
     `404` NOT FOUND - Category not found
     """
     search_enum_check(search_type, start_date, end_date)
-    category_exists = db.query(
-        exists().where(
-            and_(
-                models.Category.id == category_id,
-                models.Category.user_id == current_user.id,
-            )
-        )
-    ).scalar()
-    if not category_exists:
+    category_type = await manager.get_category_type(db, current_user.id, category_id)
+    if not category_type:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found",
@@ -267,7 +582,8 @@ async def get_my_transactions_by_filter(
 
 @router.patch(
     "/currency",
-    status_code=status.HTTP_200_OK,
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=schemas_v_1.Job,
 )
 async def update_transactions_currency(
     input_data: schemas_v_1.TransactionCurrencyUpdate,
@@ -275,7 +591,7 @@ async def update_transactions_currency(
     current_user: models.User = Depends(get_current_user),
 ) -> UJSONResponse:
     """
-    Update currency \n
+    Update currency in background job \n
     JSON data \n
     `currency_to_update`: CurrencyEnum \n
     `currency_to_replace`: CurrencyEnum \n
@@ -283,19 +599,89 @@ async def update_transactions_currency(
     `start_date`: date \n
     `end_date`: date \n
     Responses: \n
-    `200` OK \n
-    `422` UNPROCESSABLE_ENTITY - Failed field validation
+    `202` ACCEPTED - Poll job status at `/jobs/{id}` \n
+    `409` CONFLICT - Overlapping conversion is in progress \n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation \n
+    `503` SERVICE_UNAVAILABLE - Job could not be queued
     """
-    task = "workers.celery_tasks.update_currency_in_transactions"
-    celery_app.send_task(
-        task,
-        args=[
-            input_data.currency_to_update,
-            input_data.currency_to_replace,
-            input_data.cross_course,
-            input_data.start_date,
-            input_data.end_date,
-            current_user.id,
-        ],
+    params = input_data.model_dump(mode="json")
+    # Serialize enqueueing per user, so concurrent taps see each other's job
+    await manager.advisory_xact_lock(db, manager.LockNamespace.JOB, current_user.id)
+    running_job = await manager.get_overlapping_currency_job(
+        db,
+        current_user.id,
+        input_data.currency_to_update,
+        input_data.currency_to_replace,
+        input_data.start_date,
+        input_data.end_date,
     )
-    return status.HTTP_200_OK
+    if running_job:
+        # A job whose chord is still being published may yet fail to queue,
+        # so only a published job is safe to hand out
+        if running_job.params != params or not running_job.published:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Overlapping conversion is in progress",
+            )
+        # Repeated request is coalesced into the job already queued
+        job_status = await manager.get_job_status(db, running_job.id, current_user.id)
+        db.commit()
+        return job_status
+    date_ranges = split_date_range(
+        input_data.start_date,
+        input_data.end_date,
+        settings.CURRENCY_CONVERSION_SHARD_DAYS,
+    )
+    job = await manager.create_job(
+        db,
+        current_user.id,
+        models.JobTypeEnum.CURRENCY_CONVERSION.value,
+        params,
+        total_shards=len(date_ranges),
+    )
+    db.commit()
+    # Shards of a job sink in priority one by one, so first shards of other
+    # users overtake the tail of a long conversion
+    max_priority = settings.CURRENCY_QUEUE_MAX_PRIORITY
+    shards = [
+        publisher.signature(
+            "workers.celery_tasks.update_currency_in_transactions",
+            args=[
+                input_data.currency_to_update,
+                input_data.currency_to_replace,
+                input_data.cross_course,
+                start_date.isoformat(),
+                end_date.isoformat(),
+                current_user.id,
+                job.id,
+                shard,
+            ],
+            priority=max(max_priority - shard, 0),
+        )
+        for shard, (start_date, end_date) in enumerate(date_ranges)
+    ]
+    # celery.chord_unlock, which polls the shards, is published with the
+    # queue and priority of the callback, so both outrun queued shards
+    callback = publisher.signature(
+        "workers.celery_tasks.finish_currency_conversion",
+        args=[current_user.id, job.id],
+        priority=max_priority,
+    ).on_error(
+        publisher.signature(
+            "workers.celery_tasks.fail_job", args=[job.id], priority=max_priority
+        )
+    )
+    try:
+        await publisher.apply_async(publisher.chord(shards, callback))
+    except Exception as exc:
+        # The job is already committed, without its tasks it would stay
+        # PENDING and block overlapping conversions until it goes stale
+        await manager.fail_job(db, job.id, repr(exc))
+        db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Background job could not be queued",
+        )
+    await manager.publish_job(db, job.id)
+    db.commit()
+    return await manager.get_job_status(db, job.id, current_user.id)
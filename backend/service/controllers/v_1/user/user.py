@@ -1,11 +1,16 @@
+from datetime import date
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import UJSONResponse
+from sqlalchemy import func
 
 from db import manager, models
 from db.session import DBSession
 from service.core.dependencies import get_current_user, get_db
 from service.core.security import create_jwt_token
 from service.schemas import v_1 as schemas_v_1
+from workers.publisher import publisher
 
 router = APIRouter()
 
@@ -73,6 +78,35 @@ async def get_my_user_info(
     return user
 
 
+@router.get(
+    "/balance",
+    status_code=status.HTTP_200_OK,
+    response_model=schemas_v_1.UserBalance,
+)
+async def get_my_balance(
+    at: Optional[date] = None,
+    db: DBSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> UJSONResponse:
+    """
+    Get my balance per currency at the end of the day \n
+    QUERY params \n
+    `at`: Optional[date] - today by default \n
+    Responses: \n
+    `200` OK \n
+    `422` UNPROCESSABLE_ENTITY - Failed field validation
+    """
+    at = at or date.today()
+    balances = await manager.get_balance_at(db, current_user.id, at)
+    return {
+        "at": at,
+        "balances": [
+            {"currency": currency, "amount": amount}
+            for currency, amount in sorted(balances.items())
+        ],
+    }
+
+
 @router.patch(
     "/currency",
     status_code=status.HTTP_200_OK,
@@ -122,3 +156,23 @@ async def update_notifications(
     )
     us.update({"notification_on": input_data.notification_on})
     return current_user
+
+
+@router.delete("/")
+async def delete_my_user(
+    db: DBSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> UJSONResponse:
+    """
+    Delete my account, its data is purged in background \n
+    Responses: \n
+    `204` NO CONTENT
+    """
+    db.query(models.User).filter(models.User.id == current_user.id).update(
+        {"deleted_at": func.now()}, synchronize_session=False
+    )
+    db.commit()
+    await publisher.apply_async(
+        publisher.signature("workers.celery_tasks.purge_user", args=[current_user.id])
+    )
+    return status.HTTP_204_NO_CONTENT
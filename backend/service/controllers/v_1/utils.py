@@ -1,9 +1,14 @@
+import base64
+import json
 from datetime import date, timedelta
 
 from fastapi import HTTPException, status
+from sqlalchemy import (BigInteger, Date, DateTime, Interval, and_, any_,
+                        bindparam, case, cast, func, literal, select, tuple_)
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION
 from sqlalchemy.orm import joinedload, selectinload, with_loader_criteria
 
-from db import models
+from db import manager, models
 
 
 def search_enum_check(search_type, start_date, end_date):
@@ -22,54 +27,94 @@ def search_enum_check(search_type, start_date, end_date):
         )
 
 
+def split_date_range(start_date, end_date, days):
+    """Split inclusive date range into consecutive ranges of `days` days"""
+    shards = []
+    while start_date <= end_date:
+        shard_end = min(start_date + timedelta(days=days - 1), end_date)
+        shards.append((start_date, shard_end))
+        start_date = shard_end + timedelta(days=1)
+    return shards
+
+
+def search_period_bounds(search_type, start_date, end_date):
+    """Inclusive (start, end) dates of a search period, None is unbounded"""
+    today = date.today()
+    search_type = search_type.upper()
+    if search_type == models.SearchTypeEnum.DAY.value:
+        return today, today
+    if search_type == models.SearchTypeEnum.WEEK.value:
+        return today - timedelta(days=today.weekday()), None
+    if search_type == models.SearchTypeEnum.MONTH.value:
+        return date(today.year, today.month, 1), None
+    if search_type == models.SearchTypeEnum.YEAR.value:
+        return date(today.year, 1, 1), None
+    return start_date, end_date
+
+
+def date_range_criteria(start_date, end_date):
+    if start_date and start_date == end_date:
+        return [models.Transaction.date == start_date]
+    criteria = []
+    if start_date:
+        criteria.append(models.Transaction.date >= start_date)
+    if end_date:
+        criteria.append(models.Transaction.date <= end_date)
+    return criteria
+
+
+def transactions_filter_criteria(
+    search_type, user_id, start_date, end_date, category_id
+):
+    return [
+        models.Transaction.user_id == user_id,
+        models.Transaction.category_id == category_id,
+        *date_range_criteria(*search_period_bounds(search_type, start_date, end_date)),
+    ]
+
+
 def transactions_filter_search(
     db, search_type, user_id, start_date, end_date, category_id
 ):
-    if search_type.upper() == models.SearchTypeEnum.DAY.value:
-        transactions = db.query(models.Transaction).filter(
-            models.Transaction.user_id == user_id,
-            models.Transaction.category_id == category_id,
-            models.Transaction.date == date.today(),
-        )
-    elif search_type.upper() == models.SearchTypeEnum.WEEK.value:
-        start_of_week = date.today() - timedelta(days=date.today().weekday())
-        transactions = db.query(models.Transaction).filter(
-            models.Transaction.user_id == user_id,
-            models.Transaction.category_id == category_id,
-            models.Transaction.date >= start_of_week,
-        )
-    elif search_type.upper() == models.SearchTypeEnum.MONTH.value:
-        start_of_month = date(date.today().year, date.today().month, 1)
-        transactions = db.query(models.Transaction).filter(
-            models.Transaction.user_id == user_id,
-            models.Transaction.category_id == category_id,
-            models.Transaction.date >= start_of_month,
-        )
-    elif search_type.upper() == models.SearchTypeEnum.YEAR.value:
-        start_of_year = date(date.today().year, 1, 1)
-        transactions = db.query(models.Transaction).filter(
-            models.Transaction.user_id == user_id,
-            models.Transaction.category_id == category_id,
-            models.Transaction.date >= start_of_year,
-        )
-    elif search_type.upper() == models.SearchTypeEnum.INTERVAL.value:
-        transactions = db.query(models.Transaction).filter(
-            models.Transaction.user_id == user_id,
-            models.Transaction.category_id == category_id,
-            models.Transaction.date >= start_date,
-            models.Transaction.date <= end_date,
+    transactions = db.query(models.Transaction).filter(
+        *transactions_filter_criteria(
+            search_type, user_id, start_date, end_date, category_id
         )
+    )
     return transactions.options(joinedload(models.Transaction.category))
 
 
+def transactions_ids_criteria(user_id, ids):
+    return [
+        models.Transaction.id == any_(bindparam("ids", ids, ARRAY(BigInteger))),
+        models.Transaction.user_id == user_id,
+    ]
+
+
+def transactions_bulk_criteria(user_id, selection):
+    """WHERE clause of bulk operation, by id list or by category filter"""
+    if selection.ids:
+        return transactions_ids_criteria(user_id, selection.ids)
+    search_enum_check(selection.search_type, selection.start_date, selection.end_date)
+    return transactions_filter_criteria(
+        selection.search_type,
+        user_id,
+        selection.start_date,
+        selection.end_date,
+        selection.category_id,
+    )
+
+
 def category_tr_filter_search(
     db, search_type, user_id, start_date, end_date, expense=None, income=None
 ):
     if search_type.upper() == models.SearchTypeEnum.DAY.value:
         categories = (
             db.query(models.Category)
-            .join(models.Transaction)
-            .filter(models.Category.user_id == user_id)
+            .filter(
+                models.Category.user_id == user_id,
+                models.Category.transaction.any(),
+            )
             .options(
                 selectinload(models.Category.transaction),
                 with_loader_criteria(
@@ -81,8 +126,10 @@ def category_tr_filter_search(
         start_of_week = date.today() - timedelta(days=date.today().weekday())
         categories = (
             db.query(models.Category)
-            .join(models.Transaction)
-            .filter(models.Category.user_id == user_id)
+            .filter(
+                models.Category.user_id == user_id,
+                models.Category.transaction.any(),
+            )
             .options(
                 selectinload(models.Category.transaction),
                 with_loader_criteria(
@@ -94,8 +141,10 @@ def category_tr_filter_search(
         start_of_month = date(date.today().year, date.today().month, 1)
         categories = (
             db.query(models.Category)
-            .join(models.Transaction)
-            .filter(models.Category.user_id == user_id)
+            .filter(
+                models.Category.user_id == user_id,
+                models.Category.transaction.any(),
+            )
             .options(
                 selectinload(models.Category.transaction),
                 with_loader_criteria(
@@ -107,8 +156,10 @@ def category_tr_filter_search(
         start_of_year = date(date.today().year, 1, 1)
         categories = (
             db.query(models.Category)
-            .join(models.Transaction)
-            .filter(models.Category.user_id == user_id)
+            .filter(
+                models.Category.user_id == user_id,
+                models.Category.transaction.any(),
+            )
             .options(
                 selectinload(models.Category.transaction),
                 with_loader_criteria(
@@ -119,8 +170,10 @@ def category_tr_filter_search(
     elif search_type.upper() == models.SearchTypeEnum.INTERVAL.value:
         categories = (
             db.query(models.Category)
-            .join(models.Transaction)
-            .filter(models.Category.user_id == user_id)
+            .filter(
+                models.Category.user_id == user_id,
+                models.Category.transaction.any(),
+            )
             .options(
                 selectinload(models.Category.transaction),
                 with_loader_criteria(
@@ -139,3 +192,257 @@ def category_tr_filter_search(
             models.Category.type == models.CategoryTypeEnum.INCOME.value
         )
     return categories
+
+
+def transactions_series(
+    db, period, user_id, start_date, end_date, category_ids=None, currency=None
+):
+    """Income and expense totals per period bucket in one query,
+    buckets without transactions are zero-filled by generate_series.
+    With `currency` amounts are converted on the fly by the rate of their date,
+    rows without a known rate are left out of the totals and counted
+    in `unconverted`"""
+    if currency:
+        amount = manager.converted_amount(currency)
+        # Rows already in `currency` skip the second rate lookup
+        unconverted = func.count().filter(
+            and_(models.Transaction.currency != currency, amount.is_(None))
+        )
+    else:
+        amount = models.Transaction.amount
+        unconverted = literal(0)
+    step = cast(f"1 {period}", Interval)
+    buckets = select(
+        cast(
+            func.generate_series(
+                func.date_trunc(period, cast(start_date, DateTime)),
+                cast(end_date, DateTime),
+                step,
+            ),
+            Date,
+        ).label("bucket")
+    ).subquery("buckets")
+
+    is_income = models.Category.type == models.CategoryTypeEnum.INCOME.value
+    totals = (
+        select(
+            cast(
+                func.date_trunc(period, cast(models.Transaction.date, DateTime)), Date
+            ).label("bucket"),
+            func.sum(case((is_income, amount), else_=0)).label("income"),
+            func.sum(case((is_income, 0), else_=amount)).label("expense"),
+            unconverted.label("unconverted"),
+        )
+        .select_from(models.Transaction)
+        .join(models.Category, models.Category.id == models.Transaction.category_id)
+        .filter(
+            models.Transaction.user_id == user_id,
+            models.Transaction.date >= start_date,
+            models.Transaction.date <= end_date,
+        )
+        .group_by("bucket")
+    )
+    if category_ids:
+        totals = totals.filter(models.Transaction.category_id.in_(category_ids))
+    totals = totals.subquery("totals")
+
+    series = (
+        select(
+            buckets.c.bucket,
+            func.coalesce(totals.c.income, 0).label("income"),
+            func.coalesce(totals.c.expense, 0).label("expense"),
+            func.coalesce(totals.c.unconverted, 0).label("unconverted"),
+        )
+        .select_from(buckets.outerjoin(totals, totals.c.bucket == buckets.c.bucket))
+        .order_by(buckets.c.bucket)
+    )
+    return db.execute(series).all()
+
+
+def transactions_daily_totals(db, user_id, start_date, end_date, category_ids=None):
+    """Income and expense sums per currency and day, small enough
+    to be converted in memory by the exchange rate cache"""
+    is_income = models.Category.type == models.CategoryTypeEnum.INCOME.value
+    totals = (
+        select(
+            models.Transaction.currency,
+            models.Transaction.date,
+            is_income.label("is_income"),
+            func.sum(models.Transaction.amount).label("amount"),
+        )
+        .select_from(models.Transaction)
+        .join(models.Category, models.Category.id == models.Transaction.category_id)
+        .filter(
+            models.Transaction.user_id == user_id,
+            models.Transaction.date >= start_date,
+            models.Transaction.date <= end_date,
+        )
+        .group_by(models.Transaction.currency, models.Transaction.date, is_income)
+    )
+    if category_ids:
+        totals = totals.filter(models.Transaction.category_id.in_(category_ids))
+    return db.execute(totals).all()
+
+
+def encode_cursor(*values) -> str:
+    """Opaque keyset pagination cursor of the last returned row"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def cursor_number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(value)
+    return value
+
+
+def cursor_id(value):
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise TypeError(value)
+    if not -(2**63) <= value < 2**63:
+        raise ValueError(value)
+    return value
+
+
+def decode_cursor(cursor, *parsers):
+    """Values of a cursor made by `encode_cursor`, one per parser.
+    Cursors of other shape or with values the parsers reject are `400`"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError(cursor)
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Wrong cursor"
+        )
+
+
+def escape_like(value: str) -> str:
+    return value.replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+
+def transactions_search(
+    db,
+    user_id,
+    q,
+    limit,
+    cursor=None,
+    category_ids=None,
+    start_date=None,
+    end_date=None,
+):
+    """Transactions whose note contains `q`, most similar first.
+    Contains filter is served by the pg_trgm GIN index on note,
+    pages are walked by (rank, id) keyset instead of OFFSET.
+    similarity() is real, the rank is compared as double precision, the
+    type the cursor value round-trips through JSON without loss"""
+    rank = cast(func.similarity(models.Transaction.note, q), DOUBLE_PRECISION)
+    transactions = db.query(models.Transaction, rank.label("rank")).filter(
+        models.Transaction.user_id == user_id,
+        models.Transaction.note.ilike(f"%{escape_like(q)}%", escape="/"),
+    )
+    if category_ids:
+        transactions = transactions.filter(
+            models.Transaction.category_id.in_(category_ids)
+        )
+    if start_date:
+        transactions = transactions.filter(models.Transaction.date >= start_date)
+    if end_date:
+        transactions = transactions.filter(models.Transaction.date <= end_date)
+    if cursor:
+        last_rank, last_id = decode_cursor(cursor, cursor_number, cursor_id)
+        transactions = transactions.filter(
+            tuple_(rank, models.Transaction.id)
+            < tuple_(cast(last_rank, DOUBLE_PRECISION), last_id)
+        )
+    rows = (
+        transactions.options(joinedload(models.Transaction.category))
+        .order_by(rank.desc(), models.Transaction.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].rank, rows[-1].Transaction.id)
+    return rows, next_cursor
+
+
+def transactions_query(
+    db,
+    user_id,
+    limit,
+    cursor=None,
+    category_ids=None,
+    category_type=None,
+    currencies=None,
+    amount_min=None,
+    amount_max=None,
+    search_type=None,
+    start_date=None,
+    end_date=None,
+    note=None,
+):
+    """Transactions matching every given filter, newest first.
+    Filters compose into one query over ix_transaction_user_id_date_id_btree,
+    pages are walked by (date, id) keyset instead of OFFSET"""
+    if search_type:
+        start_date, end_date = search_period_bounds(search_type, start_date, end_date)
+    criteria = [
+        models.Transaction.user_id == user_id,
+        *date_range_criteria(start_date, end_date),
+    ]
+    if category_ids:
+        criteria.append(models.Transaction.category_id.in_(category_ids))
+    if category_type:
+        criteria.append(
+            models.Transaction.category.has(models.Category.type == category_type)
+        )
+    if currencies:
+        criteria.append(models.Transaction.currency.in_(currencies))
+    if amount_min is not None:
+        criteria.append(models.Transaction.amount >= amount_min)
+    if amount_max is not None:
+        criteria.append(models.Transaction.amount <= amount_max)
+    if note:
+        criteria.append(
+            models.Transaction.note.ilike(f"%{escape_like(note)}%", escape="/")
+        )
+    if cursor:
+        last_date, last_id = decode_cursor(cursor, date.fromisoformat, cursor_id)
+        criteria.append(
+            tuple_(models.Transaction.date, models.Transaction.id)
+            < tuple_(last_date, last_id)
+        )
+    transactions = (
+        db.query(models.Transaction)
+        .filter(*criteria)
+        .options(joinedload(models.Transaction.category))
+        .order_by(models.Transaction.date.desc(), models.Transaction.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        next_cursor = encode_cursor(last.date.isoformat(), last.id)
+    return transactions, next_cursor
+
+
+def transactions_by_ids(db, user_id, ids):
+    """User's transactions by id list in one `id = ANY(:ids)` query,
+    the statement is the same for any list length. Returns transactions
+    in requested order and ids that were not found"""
+    ids = list(dict.fromkeys(ids))
+    transactions = (
+        db.query(models.Transaction)
+        .filter(*transactions_ids_criteria(user_id, ids))
+        .options(joinedload(models.Transaction.category))
+        .all()
+    )
+    by_id = {transaction.id: transaction for transaction in transactions}
+    return (
+        [by_id[id_] for id_ in ids if id_ in by_id],
+        [id_ for id_ in ids if id_ not in by_id],
+    )
@@ -23,9 +23,7 @@ async def get_db() -> Generator:
         yield session
 
 
-async def get_current_user(
-    db: DBSession = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> Optional[models.User]:
+def decode_access_token(token: str) -> int:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[HASH_ALGORITHM])
         JWTTokenPayload(pk=payload["pk"], type=models.JWTType.ACCESS.value)
@@ -33,7 +31,13 @@ async def get_current_user(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
         )
-    user = await manager.get_user(db, id=int(payload["pk"]))
+    return int(payload["pk"])
+
+
+async def get_current_user(
+    db: DBSession = Depends(get_db), token: str = Depends(reusable_oauth2)
+) -> Optional[models.User]:
+    user = await manager.get_user(db, id=decode_access_token(token))
     if user:
         return user
     raise HTTPException(
@@ -42,6 +46,23 @@ async def get_current_user(
     )
 
 
+async def get_current_user_id(token: str = Depends(reusable_oauth2)) -> int:
+    """Authenticate by access token only, for hot endpoints
+    that filter by user id and don't need the user row"""
+    return decode_access_token(token)
+
+
+async def get_current_superuser(
+    current_user: models.User = Depends(get_current_user),
+) -> models.User:
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    return current_user
+
+
 def get_request_device_info(request: Request):
     try:
         device = UserAgentDevice(
@@ -0,0 +1,192 @@
+import zlib
+from typing import Callable, Dict, Optional, Sequence
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+def skip_compression(endpoint: Callable) -> Callable:
+    """Opt route out of response compression, apply below the route decorator"""
+    endpoint.skip_compression = True
+    return endpoint
+
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """q-value of every coding listed in Accept-Encoding, a malformed
+    q-value counts as 0, i.e. not acceptable"""
+    encodings = {}
+    for item in accept_encoding.split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[coding] = quality
+    return encodings
+
+
+def choose_encoding(accept_encoding: str, available: Sequence[str]) -> Optional[str]:
+    """Available coding with the highest q-value, earlier ones win ties.
+    Codings not listed get the q-value of `*`, None when nothing fits"""
+    encodings = accepted_encodings(accept_encoding)
+    default = encodings.get("*", 0.0)
+    chosen, chosen_quality = None, 0.0
+    for coding in available:
+        quality = encodings.get(coding, default)
+        if quality > chosen_quality:
+            chosen, chosen_quality = coding, quality
+    return chosen
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        # wbits 31 writes gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        flush = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(flush)
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        compressed = self._compressor.process(data)
+        if final:
+            return compressed + self._compressor.finish()
+        return compressed + self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, as accepted by the client.
+    Bodies under `minimum_size` go out as is, streamed bodies are buffered
+    only until the threshold and then compressed chunk by chunk.
+    Chunks of `threadpool_min_size` and more are compressed in a worker thread,
+    so big payloads don't block the event loop"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        threadpool_min_size: int = 65536,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        exclude_paths: Sequence[str] = (),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.threadpool_min_size = threadpool_min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        available = ("br", "gzip") if brotli is not None else ("gzip",)
+        encoding = choose_encoding(accept_encoding, available)
+        if encoding == "br":
+            encoder_factory = lambda: BrotliEncoder(self.brotli_quality)  # noqa
+        elif encoding == "gzip":
+            encoder_factory = lambda: GzipEncoder(self.gzip_level)  # noqa
+        else:
+            await self.app(scope, receive, send)
+            return
+        responder = CompressionResponder(self, scope, send, encoder_factory)
+        await self.app(scope, receive, responder.send)
+
+
+class CompressionResponder:
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        scope: Scope,
+        send: Send,
+        encoder_factory: Callable,
+    ):
+        self.middleware = middleware
+        self.scope = scope
+        self._send = send
+        self.encoder_factory = encoder_factory
+        self.encoder = None
+        self.start_message: Optional[Message] = None
+        self.started = False
+        self.passthrough = False
+        self.buffer = bytearray()
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            endpoint = self.scope.get("endpoint")
+            self.passthrough = (
+                "content-encoding" in headers
+                or headers.get("content-type", "").startswith("text/event-stream")
+                or getattr(endpoint, "skip_compression", False)
+            )
+            if self.passthrough:
+                await self._send(message)
+                self.started = True
+            else:
+                self.start_message = message
+            return
+        if self.passthrough or message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is None:
+            self.buffer += body
+            if len(self.buffer) < self.middleware.minimum_size:
+                if more_body:
+                    return
+                # Whole body is under the threshold, send it uncompressed
+                await self._send(self.start_message)
+                await self._send(
+                    {"type": "http.response.body", "body": bytes(self.buffer)}
+                )
+                return
+            self.encoder = self.encoder_factory()
+            body, self.buffer = bytes(self.buffer), bytearray()
+
+        if len(body) >= self.middleware.threadpool_min_size:
+            data = await anyio.to_thread.run_sync(
+                self.encoder.compress, body, not more_body
+            )
+        else:
+            data = self.encoder.compress(body, not more_body)
+
+        if not self.started:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoder.name
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(data))
+            await self._send(self.start_message)
+            self.started = True
+        await self._send(
+            {"type": "http.response.body", "body": data, "more_body": more_body}
+        )
@@ -0,0 +1,110 @@
+import json
+from typing import Any, Generic, Optional, Sequence, TypeVar
+
+from fastapi import Query
+from fastapi_pagination import Params
+from fastapi_pagination.api import resolve_params
+from fastapi_pagination.bases import AbstractParams, BasePage, RawParams
+from fastapi_pagination.ext.sqlalchemy import paginate as sqlalchemy_paginate
+from fastapi_pagination.utils import create_pydantic_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import Query as ORMQuery
+
+from db.models import PageCountEnum
+from db.models.soft_delete import soft_delete_criteria
+
+T = TypeVar("T")
+
+
+class LimitParams(Params):
+    count: PageCountEnum = Query(
+        PageCountEnum.NONE, description="Total: none, planner estimate or exact"
+    )
+
+    def to_raw_params(self) -> RawParams:
+        # One extra row tells whether there is a next page
+        return RawParams(
+            limit=self.size + 1,
+            offset=self.size * (self.page - 1),
+            include_total=self.count == PageCountEnum.EXACT,
+        )
+
+
+class LimitPage(BasePage[T], Generic[T]):
+    """Page without COUNT(*) by default, `has_next` comes from fetching
+    one row over the page size"""
+
+    page: int
+    size: int
+    has_next: bool
+    total_is_estimate: bool = False
+
+    __params_type__ = LimitParams
+
+    @classmethod
+    def create(
+        cls,
+        items: Sequence[T],
+        params: AbstractParams,
+        *,
+        total: Optional[int] = None,
+        estimated_total: Optional[int] = None,
+        **kwargs: Any,
+    ) -> "LimitPage[T]":
+        if not isinstance(params, LimitParams):
+            raise TypeError("LimitPage should be used with LimitParams")
+        return create_pydantic_model(
+            cls,
+            items=items[: params.size],
+            page=params.page,
+            size=params.size,
+            has_next=len(items) > params.size,
+            total=total if total is not None else estimated_total,
+            total_is_estimate=total is None and estimated_total is not None,
+            **kwargs,
+        )
+
+
+def estimate_count(query: ORMQuery) -> Optional[int]:
+    """Planner estimate of distinct entities the query returns, one
+    EXPLAIN without executing it. Accuracy follows table statistics"""
+    entity = query.column_descriptions[0]["entity"]
+    if entity is None:
+        return None
+    mapper = inspect(entity)
+    # Mapped attributes, not table columns, so the select stays an ORM
+    # statement that loader criteria apply to
+    primary_key = [
+        getattr(entity, mapper.get_property_by_column(column).key)
+        for column in mapper.primary_key
+    ]
+    statement = (
+        query.enable_eagerloads(False)
+        .with_entities(*primary_key)
+        .order_by(None)
+        .distinct()
+        .statement
+    )
+    # EXPLAIN is not an ORM execution, so criteria the session adds
+    # there have to be applied here
+    if not query.get_execution_options().get("include_deleted", False):
+        statement = statement.options(*soft_delete_criteria())
+    connection = query.session.connection()
+    compiled = statement.compile(
+        dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def paginate(query: ORMQuery) -> LimitPage:
+    """Paginate legacy ORM query into the page type of the route"""
+    params = resolve_params()
+    additional_data = {}
+    if getattr(params, "count", None) == PageCountEnum.ESTIMATE:
+        additional_data["estimated_total"] = estimate_count(query)
+    return sqlalchemy_paginate(query, additional_data=additional_data)
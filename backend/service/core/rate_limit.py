@@ -0,0 +1,181 @@
+import math
+import re
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+import anyio
+from jose import jwt
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from db.models import RateLimitBucket
+from db.session import engine
+
+from . import settings
+from .security import HASH_ALGORITHM
+
+
+class MemoryBucketBackend:
+    """Token buckets of this process, limits apply per worker"""
+
+    max_keys = 100_000
+
+    def __init__(self):
+        # Least recently used first, idle buckets are popped from the front
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def consume(
+        self, key: str, cost: int, capacity: int, rate: float
+    ) -> Tuple[bool, float]:
+        """Take `cost` tokens from the bucket of `key`,
+        returns whether it was allowed and tokens left"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._prune(now, capacity / rate)
+        self._buckets[key] = (tokens, now)
+        return allowed, tokens
+
+    def _prune(self, now: float, refill_time: float) -> None:
+        # Buckets idle long enough to be full again are the same as absent.
+        # Every bucket is popped once, so the cost per request is amortized
+        while self._buckets:
+            _, updated = next(iter(self._buckets.values()))
+            if now - updated < refill_time and len(self._buckets) < self.max_keys:
+                return
+            self._buckets.popitem(last=False)
+
+
+class DatabaseBucketBackend:
+    """Token buckets shared by all workers in an UNLOGGED table.
+    Refill and take are one conditional upsert, so concurrent requests
+    with the same key can't overspend"""
+
+    def __init__(self):
+        self._pruned_at = time.monotonic()
+
+    async def consume(
+        self, key: str, cost: int, capacity: int, rate: float
+    ) -> Tuple[bool, float]:
+        return await anyio.to_thread.run_sync(self._consume, key, cost, capacity, rate)
+
+    def _prune(self, refill_time: float) -> None:
+        """Delete buckets idle long enough to be full again, they are
+        the same as absent. Each worker runs it once per refill time"""
+        now = time.monotonic()
+        if now - self._pruned_at < refill_time:
+            return
+        self._pruned_at = now
+        with engine.begin() as connection:
+            connection.execute(
+                delete(RateLimitBucket).where(
+                    RateLimitBucket.updated_at
+                    < func.clock_timestamp() - timedelta(seconds=refill_time)
+                )
+            )
+
+    @staticmethod
+    def _refilled(capacity: int, rate: float):
+        elapsed = func.extract(
+            "epoch", func.clock_timestamp() - RateLimitBucket.updated_at
+        )
+        return func.least(capacity, RateLimitBucket.tokens + elapsed * rate)
+
+    def _consume(
+        self, key: str, cost: int, capacity: int, rate: float
+    ) -> Tuple[bool, float]:
+        self._prune(capacity / rate)
+        refilled = self._refilled(capacity, rate)
+        stmt = insert(RateLimitBucket).values(
+            key=key, tokens=capacity - cost, updated_at=func.clock_timestamp()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RateLimitBucket.key],
+            set_={"tokens": refilled - cost, "updated_at": func.clock_timestamp()},
+            # Nothing is updated or returned when there are not enough tokens
+            where=refilled >= cost,
+        ).returning(RateLimitBucket.tokens)
+        with engine.begin() as connection:
+            tokens = connection.execute(stmt).scalar()
+            if tokens is not None:
+                return True, tokens
+            tokens = connection.execute(
+                select(refilled).where(RateLimitBucket.key == key)
+            ).scalar()
+        return False, tokens
+
+
+RATE_LIMIT_BACKENDS = {
+    "memory": MemoryBucketBackend,
+    "database": DatabaseBucketBackend,
+}
+
+
+class RateLimitMiddleware:
+    """Token bucket per user, keyed by access token `pk`, anonymous
+    requests are keyed by client address. Behind a proxy the address is
+    taken from X-Forwarded-For by the server, see FORWARDED_ALLOW_IPS.
+    Routes cost 1 token unless their path matches a pattern of `route_costs`"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend: str = "memory",
+        capacity: int = 60,
+        refill_rate: float = 1.0,
+        route_costs: Optional[Dict[str, int]] = None,
+    ):
+        self.app = app
+        self.backend = RATE_LIMIT_BACKENDS[backend]()
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.route_costs = [
+            (re.compile(pattern), cost) for pattern, cost in (route_costs or {}).items()
+        ]
+
+    def route_cost(self, path: str) -> int:
+        for pattern, cost in self.route_costs:
+            if pattern.search(path):
+                return min(cost, self.capacity)
+        return 1
+
+    def client_key(self, scope: Scope) -> str:
+        authorization = Headers(scope=scope).get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                payload = jwt.decode(
+                    token, settings.SECRET_KEY, algorithms=[HASH_ALGORITHM]
+                )
+                return f"user:{payload['pk']}"
+            except (jwt.JWTError, KeyError):
+                pass
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        cost = self.route_cost(scope["path"])
+        allowed, tokens = await self.backend.consume(
+            self.client_key(scope), cost, self.capacity, self.refill_rate
+        )
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+        retry_after = max(math.ceil((cost - (tokens or 0)) / self.refill_rate), 1)
+        response = JSONResponse(
+            {"detail": "Too many requests"},
+            status_code=429,
+            headers={"Retry-After": str(retry_after)},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,71 @@
+import asyncio
+from typing import Any, Callable, Coroutine, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from jose import jwt
+
+from . import settings
+from .security import HASH_ALGORITHM
+
+RouteHandler = Callable[[Request], Coroutine[Any, Any, Response]]
+
+
+def single_flight(endpoint: Callable) -> Callable:
+    """Opt GET route into request coalescing, apply below the route decorator.
+    Only for read-only routes without background tasks"""
+    endpoint.single_flight = True
+    return endpoint
+
+
+class SingleFlightRoute(APIRoute):
+    """Concurrent identical requests of a `single_flight` route share one
+    handler run, including dependencies, query and serialization.
+    Requests are identical when they are made by the same user, to the
+    same path with the same query string. Requests without a valid
+    access token are never coalesced"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._in_flight: Dict[Tuple[int, str, str], asyncio.Task] = {}
+
+    def get_route_handler(self) -> RouteHandler:
+        handler = super().get_route_handler()
+        if not getattr(self.endpoint, "single_flight", False):
+            return handler
+
+        async def coalesced_handler(request: Request) -> Response:
+            if request.method != "GET":
+                return await handler(request)
+            key = self.request_key(request)
+            if key is None:
+                return await handler(request)
+            task = self._in_flight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(handler(request))
+                self._in_flight[key] = task
+                task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            # A disconnected client must not cancel the run others wait for
+            return await asyncio.shield(task)
+
+        return coalesced_handler
+
+    @staticmethod
+    def request_key(request: Request) -> Optional[Tuple[int, str, str]]:
+        authorization = request.headers.get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[HASH_ALGORITHM]
+            )
+            pk = int(payload["pk"])
+        except (jwt.JWTError, KeyError, TypeError, ValueError):
+            return None
+        return (
+            pk,
+            request.url.path,
+            # Same parameters in any order are the same request
+            "&".join(sorted(request.url.query.split("&"))),
+        )
@@ -1,13 +1,14 @@
 from datetime import datetime, timedelta
-from typing import Final, Union
+from functools import lru_cache
+from typing import TYPE_CHECKING, Final, Union
 
 from jose import jwt
-from passlib.context import CryptContext
 
 from db.models import JWTType
 from service.core import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
 
 HASH_ALGORITHM: Final[str] = "HS256"
 
@@ -36,9 +37,17 @@ def create_jwt_token(pk: Union[int, str], jwt_type: JWTType = JWTType.ACCESS) ->
     return encoded_jwt
 
 
+@lru_cache()
+def get_pwd_context() -> "CryptContext":
+    """Passlib is imported on first password check, not at startup"""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def set_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
@@ -62,6 +62,63 @@ class Settings(BaseSettings):
             values.get("DB_NAME"),
         )
 
+    ################
+    # TRANSACTIONS #
+    ################
+    TRANSACTION_BATCH_MAX_IDS: int = 200
+
+    ##################
+    # EXCHANGE RATES #
+    ##################
+    EXCHANGE_RATE_CACHE_TTL: int = 300  # 5 minutes
+
+    ##########
+    # CELERY #
+    ##########
+    CURRENCY_CONVERSION_SHARD_DAYS: int = 90
+    CELERY_DB_POOL_SIZE: int = 5
+    CELERY_DB_MAX_OVERFLOW: int = 5
+    CELERY_DB_POOL_RECYCLE: int = 1800  # 30 minutes
+    CELERY_DB_POOL_STATS_INTERVAL: int = 60  # seconds, 0 disables
+    CELERY_PUBLISH_BATCH_SIZE: int = 100
+    CELERY_CONFIRM_PUBLISH: bool = True
+    CURRENCY_QUEUE_MAX_PRIORITY: int = 10
+    JOB_STALE_AFTER: int = 3600  # 1 hour
+    PURGE_BATCH_SIZE: int = 5000
+
+    ###############
+    # COMPRESSION #
+    ###############
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # 1 KB
+    COMPRESSION_THREADPOOL_MIN_SIZE: int = 65536  # 64 KB
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_EXCLUDED_PATHS: List[str] = []
+
+    ##############
+    # RATE LIMIT #
+    ##############
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # memory or database
+    RATE_LIMIT_CAPACITY: int = 60
+    RATE_LIMIT_REFILL_RATE: float = 1.0  # tokens per second
+    RATE_LIMIT_ROUTE_COSTS: Dict[str, int] = {
+        r"/filter$": 5,
+        r"/transaction/(series|summary|search|query)$": 3,
+        r"/transaction/bulk-": 5,
+    }
+
+    ######################
+    # PUSH NOTIFICATIONS #
+    ######################
+    FCM_URL: str = "https://fcm.googleapis.com"
+    FCM_CREDENTIALS_FILE: str = os.getenv("FCM_CREDENTIALS_FILE", "")
+    FCM_CONCURRENCY: int = 64
+    FCM_MAX_RETRIES: int = 3
+    FCM_RETRY_BACKOFF: float = 0.5  # seconds, doubled every attempt
+    FCM_TIMEOUT: float = 10
+    FCM_DEVICE_BATCH_SIZE: int = 5000
+
     #######
     # JWT #
     #######
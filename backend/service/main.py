@@ -1,13 +1,39 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from service.controllers.v_1.api import root_router
 from service.core import settings
+from service.core.middleware import CompressionMiddleware
+from service.core.rate_limit import RateLimitMiddleware
+from workers.publisher import publisher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    publisher.start()
+    yield
+    await publisher.stop()
+
 
 app = FastAPI(
-    title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    title=settings.PROJECT_NAME,
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
+# Added before CORS, so CORS wraps it: preflight requests are answered
+# without spending tokens and 429 responses carry the CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=settings.RATE_LIMIT_BACKEND,
+        capacity=settings.RATE_LIMIT_CAPACITY,
+        refill_rate=settings.RATE_LIMIT_REFILL_RATE,
+        route_costs=settings.RATE_LIMIT_ROUTE_COSTS,
+    )
+
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
     app.add_middleware(
@@ -16,7 +42,16 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Retry-After"],
     )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    threadpool_min_size=settings.COMPRESSION_THREADPOOL_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    exclude_paths=settings.COMPRESSION_EXCLUDED_PATHS,
+)
 
 app.include_router(root_router, prefix="/api")
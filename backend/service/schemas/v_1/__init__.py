@@ -1,10 +1,26 @@
 from .auth.auth import AuthForm
 from .auth.jwt_token import JWTTokenPayload, JWTTokensResponse
+from .budget.budget import Budget, BudgetCreate, BudgetsUsage, BudgetUsage
 from .category.category import Category, CategoryCreate, CategoryTransactions
-from .transaction.transaction import (Transaction, TransactionCreate,
+from .exchange_rate.exchange_rate import ExchangeRate, ExchangeRateCreate
+from .job.job import Job
+from .metrics.metrics import Metrics, StatementCacheMetrics
+from .transaction.transaction import (Transaction, TransactionBatch,
+                                      TransactionBatchRequest,
+                                      TransactionBulkRecategorize,
+                                      TransactionBulkResult,
+                                      TransactionBulkSelection,
+                                      TransactionCreate,
                                       TransactionCurrencyUpdate,
-                                      TransactionOnCreate)
-from .user.user import (User, UserAgentDevice, UserCreate, UserCurrencyUpdate,
+                                      TransactionOnCreate,
+                                      TransactionQueryPage,
+                                      TransactionSearchPage,
+                                      TransactionSearchResult,
+                                      TransactionSeries,
+                                      TransactionSeriesPoint,
+                                      TransactionSummary)
+from .user.user import (CurrencyBalance, User, UserAgentDevice, UserBalance,
+                        UserCreate, UserCurrencyUpdate,
                         UserNotificationsUpdate)
 
 __all__ = (
@@ -19,6 +35,8 @@ __all__ = (
     "User",
     "UserNotificationsUpdate",
     "UserCurrencyUpdate",
+    "CurrencyBalance",
+    "UserBalance",
     # Category
     "CategoryCreate",
     "Category",
@@ -28,4 +46,28 @@ __all__ = (
     "Transaction",
     "TransactionCurrencyUpdate",
     "TransactionOnCreate",
+    "TransactionSeries",
+    "TransactionSeriesPoint",
+    "TransactionSummary",
+    "TransactionSearchResult",
+    "TransactionSearchPage",
+    "TransactionQueryPage",
+    "TransactionBatchRequest",
+    "TransactionBatch",
+    "TransactionBulkSelection",
+    "TransactionBulkRecategorize",
+    "TransactionBulkResult",
+    # Exchange rate
+    "ExchangeRateCreate",
+    "ExchangeRate",
+    # Job
+    "Job",
+    # Budget
+    "BudgetCreate",
+    "Budget",
+    "BudgetUsage",
+    "BudgetsUsage",
+    # Metrics
+    "StatementCacheMetrics",
+    "Metrics",
 )
@@ -0,0 +1,42 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel, PositiveFloat, PositiveInt, computed_field
+
+from db import models
+
+
+class BudgetCreate(BaseModel):
+    category_id: Optional[PositiveInt] = None
+    currency: models.CurrencyEnum
+    amount: PositiveFloat
+
+    class Config:
+        use_enum_values = True
+
+
+class Budget(BudgetCreate):
+    id: PositiveInt
+
+    class Config:
+        use_enum_values = True
+        from_attributes = True
+
+
+class BudgetUsage(Budget):
+    spent: float
+
+    @computed_field
+    @property
+    def remaining(self) -> float:
+        return round(self.amount - self.spent, 2)
+
+    @computed_field
+    @property
+    def utilization(self) -> float:
+        return round(self.spent / self.amount, 4)
+
+
+class BudgetsUsage(BaseModel):
+    month: date
+    items: List[BudgetUsage]
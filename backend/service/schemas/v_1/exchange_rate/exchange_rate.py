@@ -0,0 +1,29 @@
+from datetime import date
+
+from pydantic import BaseModel, PositiveFloat, PositiveInt, model_validator
+
+from db import models
+
+
+class ExchangeRateCreate(BaseModel):
+    base_currency: models.CurrencyEnum
+    quote_currency: models.CurrencyEnum
+    rate: PositiveFloat
+    date: date
+
+    class Config:
+        use_enum_values = True
+
+    @model_validator(mode="after")
+    def validate_pair(self):
+        if self.base_currency == self.quote_currency:
+            raise ValueError("base_currency and quote_currency must differ")
+        return self
+
+
+class ExchangeRate(ExchangeRateCreate):
+    id: PositiveInt
+
+    class Config:
+        use_enum_values = True
+        from_attributes = True
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, PositiveInt, computed_field
+
+from db import models
+
+
+class Job(BaseModel):
+    id: PositiveInt
+    type: models.JobTypeEnum
+    status: models.JobStatusEnum
+    total_shards: int
+    completed_shards: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        use_enum_values = True
+        from_attributes = True
+
+    @computed_field
+    @property
+    def progress(self) -> float:
+        if not self.total_shards:
+            return 0.0
+        return round(self.completed_shards / self.total_shards, 4)
@@ -0,0 +1,15 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class StatementCacheMetrics(BaseModel):
+    hits: int
+    misses: int
+    uncached: int
+    hit_ratio: Optional[float] = None
+
+
+class Metrics(BaseModel):
+    pid: int
+    statement_cache: StatementCacheMetrics
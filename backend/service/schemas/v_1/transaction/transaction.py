@@ -1,9 +1,10 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel, PositiveInt, model_validator
+from pydantic import BaseModel, Field, PositiveInt, model_validator
 
 from db import models
+from service.core import settings
 
 from ..category.category import Category
 from ..user.user import User
@@ -54,6 +55,12 @@ class TransactionCurrencyUpdate(BaseModel):
             )
         return values
 
+    @model_validator(mode="after")
+    def validate_currencies(self):
+        if self.currency_to_update == self.currency_to_replace:
+            raise ValueError("currency_to_update and currency_to_replace must differ")
+        return self
+
     @model_validator(mode="before")
     def validate_date(cls, values):
         if values.get("start_date") and values.get("end_date"):
@@ -66,3 +73,91 @@ class TransactionCurrencyUpdate(BaseModel):
                     "wrong date",
                 )
         return values
+
+
+class TransactionSeriesPoint(BaseModel):
+    bucket: date
+    income: float
+    expense: float
+    unconverted: int
+
+    class Config:
+        from_attributes = True
+
+
+class TransactionSeries(BaseModel):
+    period: models.SeriesPeriodEnum
+    start_date: date
+    end_date: date
+    currency: Optional[models.CurrencyEnum] = None
+    unconverted: int
+    points: List[TransactionSeriesPoint]
+
+    class Config:
+        use_enum_values = True
+
+
+class TransactionSummary(BaseModel):
+    start_date: date
+    end_date: date
+    currency: models.CurrencyEnum
+    income: float
+    expense: float
+    unconverted: int
+
+    class Config:
+        use_enum_values = True
+
+
+class TransactionSearchResult(Transaction):
+    rank: float
+
+
+class TransactionSearchPage(BaseModel):
+    items: List[TransactionSearchResult]
+    next_cursor: Optional[str] = None
+
+
+class TransactionQueryPage(BaseModel):
+    items: List[Transaction]
+    next_cursor: Optional[str] = None
+
+
+class TransactionBatchRequest(BaseModel):
+    ids: List[PositiveInt] = Field(
+        ..., min_length=1, max_length=settings.TRANSACTION_BATCH_MAX_IDS
+    )
+
+
+class TransactionBatch(BaseModel):
+    items: List[Transaction]
+    missing: List[int]
+
+
+class TransactionBulkSelection(BaseModel):
+    ids: Optional[List[PositiveInt]] = Field(
+        None, min_length=1, max_length=settings.TRANSACTION_BATCH_MAX_IDS
+    )
+    category_id: Optional[PositiveInt] = None
+    search_type: Optional[models.SearchTypeEnum] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    class Config:
+        use_enum_values = True
+
+    @model_validator(mode="after")
+    def validate_selection(self):
+        if bool(self.ids) == bool(self.category_id):
+            raise ValueError("either ids or category_id filter must be passed")
+        if self.category_id and not self.search_type:
+            raise ValueError("search_type is required for category_id filter")
+        return self
+
+
+class TransactionBulkRecategorize(TransactionBulkSelection):
+    target_category_id: PositiveInt
+
+
+class TransactionBulkResult(BaseModel):
+    affected: int
@@ -1,5 +1,5 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import (BaseModel, EmailStr, Field, PositiveInt, model_validator,
                       validator)
@@ -62,3 +62,16 @@ class User(BaseModel):
 
 class UserAgentDevice(BaseModel):
     fcm_token: Optional[str]
+
+
+class CurrencyBalance(BaseModel):
+    currency: models.CurrencyEnum
+    amount: float
+
+    class Config:
+        use_enum_values = True
+
+
+class UserBalance(BaseModel):
+    at: date
+    balances: List[CurrencyBalance]
@@ -1,48 +1,115 @@
+import logging
 import os
+import threading
+import time
 from abc import ABC
+from typing import Dict
 
 from celery import Celery, Task
+from celery.signals import worker_process_init, worker_process_shutdown
+from kombu import Queue
 from sqlalchemy import create_engine
 from sqlalchemy.orm import scoped_session, sessionmaker
 
 from service.core import settings
 
+logger = logging.getLogger(__name__)
+
 celery_app = Celery(
     "worker",
     broker=os.getenv("CELERY_BROKER_URL"),
-    backend="rpc://",
+    # Chords need a result backend that stores group results
+    backend=f"db+{settings.CELERY_SQLALCHEMY_DATABASE_URI}",
 )
 
 celery_app.conf.broker_transport_options = {
-    "sentinel_kwargs": {"password": os.getenv("RABBITMQ_PASSWORD")}
+    "sentinel_kwargs": {"password": os.getenv("RABBITMQ_PASSWORD")},
+    # Wait for broker acknowledgement of every published message
+    "confirm_publish": settings.CELERY_CONFIRM_PUBLISH,
 }
 
 
+# One engine per worker process, child processes get their own pool
+# in `worker_process_init`, so connections are never shared over fork
+engine = create_engine(
+    settings.CELERY_SQLALCHEMY_DATABASE_URI,
+    pool_size=settings.CELERY_DB_POOL_SIZE,
+    max_overflow=settings.CELERY_DB_MAX_OVERFLOW,
+    pool_recycle=settings.CELERY_DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+)
+WorkerSession = scoped_session(
+    sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
+)
+
+
+def db_pool_stats() -> Dict[str, int]:
+    return {
+        "pid": os.getpid(),
+        "size": engine.pool.size(),
+        "checked_in": engine.pool.checkedin(),
+        "checked_out": engine.pool.checkedout(),
+        "overflow": engine.pool.overflow(),
+    }
+
+
+def log_db_pool_stats(interval: int) -> None:
+    while True:
+        time.sleep(interval)
+        logger.info(f"DB pool stats: {db_pool_stats()}")
+
+
+@worker_process_init.connect
+def reset_engine_after_fork(**kwargs):
+    # Connections inherited from the parent belong to it, drop them
+    # without closing, so the parent's sockets stay intact
+    engine.dispose(close=False)
+    # Tasks run in the child processes, so every child reports its own
+    # pool, the parent's engine is never used
+    if settings.CELERY_DB_POOL_STATS_INTERVAL:
+        threading.Thread(
+            target=log_db_pool_stats,
+            args=(settings.CELERY_DB_POOL_STATS_INTERVAL,),
+            name="db-pool-stats",
+            daemon=True,
+        ).start()
+
+
+@worker_process_shutdown.connect
+def dispose_engine(**kwargs):
+    engine.dispose()
+
+
 class SqlAlchemyTask(Task, ABC):
-    """An abstract Celery Task that ensures that the connection the
-    database is closed on task completion"""
+    """An abstract Celery Task that ensures that the session is returned
+    to the process pool on task completion"""
 
     abstract = True
-    _session = None
 
     def after_return(self, status, retval, task_id, args, kwargs, einfo):
-        if self._session is not None:
-            self._session.remove()
-
-    def _get_engine_session(self):
-        engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
-        session = scoped_session(
-            sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
-        )
-        return session
+        WorkerSession.remove()
 
     @property
     def session(self):
-        if self._session is None:
-            self._session = self._get_engine_session()
-        return self._session
+        return WorkerSession
 
 
+celery_app.conf.task_queues = (
+    Queue(
+        "currency-queue",
+        routing_key="currency-queue",
+        queue_arguments={"x-max-priority": settings.CURRENCY_QUEUE_MAX_PRIORITY},
+    ),
+)
+# Reserve one message at a time, so priorities apply to every fetch
+celery_app.conf.worker_prefetch_multiplier = 1
+
 celery_app.conf.task_routes = {
     "workers.celery_tasks.update_currency_in_transactions": "currency-queue",
+    "workers.celery_tasks.finish_currency_conversion": "currency-queue",
+    "workers.celery_tasks.fail_job": "currency-queue",
+    "celery.chord_unlock": "currency-queue",
+    "workers.celery_tasks.purge_category": "maintenance-queue",
+    "workers.celery_tasks.purge_user": "maintenance-queue",
+    "workers.celery_tasks.send_push_notification": "notification-queue",
 }
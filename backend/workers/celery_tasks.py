@@ -1,7 +1,23 @@
-from db import models
+import asyncio
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import delete, func, not_, select, update
+
+from db import manager, models
+from service.core import settings
+from workers import push
 from workers.celery_app import SqlAlchemyTask, celery_app
 
 
+def update_job(session, job_id, *criteria, **values):
+    session.execute(
+        update(models.Job)
+        .where(models.Job.id == job_id, *criteria)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
 @celery_app.task(acks_late=True, base=SqlAlchemyTask, bind=True)
 def update_currency_in_transactions(
     self,
@@ -11,13 +27,193 @@ def update_currency_in_transactions(
     start_date,
     end_date,
     user_id,
+    job_id=None,
+    shard=0,
 ):
-    transactions = self.session.query(models.Transaction).filter(
-        models.Transaction.user_id == user_id,
-        models.Transaction.currency == currency_to_replace,
-        models.Transaction.date.between(start_date, end_date),
+    """Convert one date range shard of a currency conversion.
+    Rows are converted and moved to the new currency by one UPDATE,
+    so a redelivered shard finds nothing left to convert.
+    Shard progress is committed in the same transaction"""
+    if currency_to_update == currency_to_replace:
+        return 0
+    result = self.session.execute(
+        update(models.Transaction)
+        .where(
+            models.Transaction.user_id == user_id,
+            models.Transaction.currency == currency_to_replace,
+            models.Transaction.date.between(start_date, end_date),
+        )
+        .values(
+            amount=models.Transaction.amount * cross_course,
+            currency=currency_to_update,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if job_id:
+        update_job(
+            self.session,
+            job_id,
+            not_(models.Job.completed_shards.any(shard)),
+            status=models.JobStatusEnum.RUNNING.value,
+            completed_shards=func.array_append(models.Job.completed_shards, shard),
+        )
+    self.session.commit()
+    return result.rowcount
+
+
+@celery_app.task(acks_late=True, base=SqlAlchemyTask, bind=True)
+def finish_currency_conversion(self, shard_results, user_id, job_id=None):
+    """Chord callback of currency conversion shards"""
+    asyncio.run(manager.rebuild_transaction_aggregates(self.session, user_id))
+    converted = sum(shard_results)
+    if job_id:
+        update_job(
+            self.session,
+            job_id,
+            status=models.JobStatusEnum.SUCCESS.value,
+            result={"converted": converted},
+            finished_at=func.now(),
+        )
+    self.session.commit()
+    return converted
+
+
+@celery_app.task(base=SqlAlchemyTask, bind=True)
+def fail_job(self, request, exc, traceback, job_id):
+    """Error callback of job tasks"""
+    update_job(
+        self.session,
+        job_id,
+        status=models.JobStatusEnum.FAILURE.value,
+        error=repr(exc),
+        finished_at=func.now(),
     )
-    for tr in transactions:
-        tr.amount = float(tr.amount) * cross_course
-        tr.currency = currency_to_update
-        self.session.commit()
+    self.session.commit()
+
+
+def purge_transactions(session, *criteria):
+    """Delete transactions in PURGE_BATCH_SIZE batches, committing each,
+    so no batch holds locks or WAL for long"""
+    table = models.Transaction.__table__
+    purged = 0
+    while True:
+        batch = (
+            select(table.c.id)
+            .where(*criteria)
+            .limit(settings.PURGE_BATCH_SIZE)
+            .scalar_subquery()
+        )
+        deleted = session.execute(delete(table).where(table.c.id.in_(batch))).rowcount
+        session.commit()
+        purged += deleted
+        if deleted < settings.PURGE_BATCH_SIZE:
+            return purged
+
+
+@celery_app.task(acks_late=True, base=SqlAlchemyTask, bind=True)
+def purge_category(self, category_id):
+    """Purge category marked as deleted together with its transactions"""
+    table = models.Category.__table__
+    deleted = self.session.execute(
+        select(table.c.id).where(
+            table.c.id == category_id, table.c.deleted_at.isnot(None)
+        )
+    ).scalar()
+    if not deleted:
+        return 0
+    purged = purge_transactions(
+        self.session, models.Transaction.__table__.c.category_id == category_id
+    )
+    self.session.execute(delete(table).where(table.c.id == category_id))
+    self.session.commit()
+    return purged
+
+
+@celery_app.task(acks_late=True, base=SqlAlchemyTask, bind=True)
+def purge_user(self, user_id):
+    """Purge user marked as deleted, transactions go in batches,
+    the remaining small tables are removed by cascade"""
+    table = models.User.__table__
+    deleted = self.session.execute(
+        select(table.c.id).where(table.c.id == user_id, table.c.deleted_at.isnot(None))
+    ).scalar()
+    if not deleted:
+        return 0
+    purged = purge_transactions(
+        self.session, models.Transaction.__table__.c.user_id == user_id
+    )
+    self.session.execute(delete(table).where(table.c.id == user_id))
+    self.session.commit()
+    return purged
+
+
+def notification_devices(
+    session, user_ids: Optional[List[int]] = None
+) -> Iterator[Dict[str, int]]:
+    """Devices of users with notifications on as {fcm_token: device_id},
+    in FCM_DEVICE_BATCH_SIZE batches. Batches are walked by device id,
+    so every query is an index range scan and pruned rows don't shift
+    the following batches"""
+    device = models.Device.__table__
+    user = models.User.__table__
+    user_settings = models.UserSettings.__table__
+    criteria = [
+        device.c.fcm_token.isnot(None),
+        device.c.fcm_token != "",
+        user.c.deleted_at.is_(None),
+        user_settings.c.notification_on.is_(True),
+    ]
+    if user_ids is not None:
+        criteria.append(device.c.user_id.in_(user_ids))
+    last_id = 0
+    while True:
+        rows = session.execute(
+            select(device.c.id, device.c.fcm_token)
+            .join(user, user.c.id == device.c.user_id)
+            .join(user_settings, user_settings.c.user_id == device.c.user_id)
+            .where(device.c.id > last_id, *criteria)
+            .order_by(device.c.id)
+            .limit(settings.FCM_DEVICE_BATCH_SIZE)
+        ).all()
+        # Read transaction is not kept open while the batch is being sent
+        session.commit()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield {row.fcm_token: row.id for row in rows}
+        if len(rows) < settings.FCM_DEVICE_BATCH_SIZE:
+            return
+
+
+async def dispatch_notification(session, message: Dict, user_ids=None) -> Dict:
+    """Send `message` batch by batch, devices with tokens FCM reported
+    as unregistered are deleted after each batch"""
+    device = models.Device.__table__
+    result = push.SendResult()
+    async with push.fcm_client() as client:
+        for devices in notification_devices(session, user_ids):
+            batch_result = await client.send_each(list(devices), message)
+            if batch_result.invalid_tokens:
+                session.execute(
+                    delete(device).where(
+                        device.c.id.in_(
+                            [devices[token] for token in batch_result.invalid_tokens]
+                        )
+                    )
+                )
+                session.commit()
+            result.merge(batch_result)
+    return {
+        "sent": result.sent,
+        "failed": result.failed,
+        "pruned": len(result.invalid_tokens),
+    }
+
+
+@celery_app.task(base=SqlAlchemyTask, bind=True)
+def send_push_notification(self, title, body, data=None, user_ids=None):
+    """Send notification to every device of users with notifications on,
+    or only of `user_ids` when given. Not acked late, a redelivered
+    message would notify everyone twice"""
+    message = push.notification_message(title, body, data)
+    return asyncio.run(dispatch_notification(self.session, message, user_ids))
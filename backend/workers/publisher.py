@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import queue
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+import anyio
+
+from service.core import settings
+
+if TYPE_CHECKING:
+    import celery
+    from celery.canvas import Signature
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+PublishItem = Tuple["Signature", Dict[str, Any], asyncio.Future]
+
+
+def load_celery_app() -> "celery.Celery":
+    """Celery app and canvas take a few hundred ms to import,
+    the API process loads them on first publish instead of at startup"""
+    from workers.celery_app import celery_app
+
+    return celery_app
+
+
+def _resolve(future: asyncio.Future, result: Any, exc: Optional[BaseException]):
+    if future.done():
+        return
+    if exc is not None:
+        future.set_exception(exc)
+    else:
+        future.set_result(result)
+
+
+class AsyncPublisher:
+    """Publishes Celery signatures from async handlers without blocking
+    the event loop. One background thread owns a pooled broker connection
+    and a producer, publishes queued meanwhile are sent in one batch
+    over the same producer checkout"""
+
+    def __init__(self, app_loader: Callable[[], "celery.Celery"], batch_size: int):
+        self._app_loader = app_loader
+        self._app: Optional["celery.Celery"] = None
+        self.batch_size = batch_size
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def app(self) -> "celery.Celery":
+        if self._app is None:
+            self._app = self._app_loader()
+        return self._app
+
+    def signature(self, name: str, **options) -> "Signature":
+        return self.app.signature(name, **options)
+
+    def chord(self, header: List["Signature"], body: "Signature") -> "Signature":
+        from celery import chord
+
+        return chord(header, body, app=self.app)
+
+    def start(self) -> None:
+        with self._lock:
+            self._closed = False
+            self._start_thread()
+
+    def _start_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="celery-publisher", daemon=True
+            )
+            self._thread.start()
+
+    async def stop(self, timeout: float = 5) -> None:
+        """Publish what is queued and stop the thread. The join runs in
+        a worker thread, so the event loop is not blocked meanwhile"""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            await anyio.to_thread.run_sync(thread.join, timeout)
+        # Left over when the thread didn't finish in time. A thread still
+        # stuck in a publish stays registered, start() reuses it
+        self._fail_pending(RuntimeError("Publisher stopped"))
+
+    def _fail_pending(self, exc: BaseException) -> None:
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP:
+                _, _, future = item
+                future.get_loop().call_soon_threadsafe(_resolve, future, None, exc)
+
+    async def apply_async(self, signature: "Signature", **options) -> Any:
+        """Publish signature, resolves to its AsyncResult once the broker
+        has accepted the message"""
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Publisher stopped")
+            self._start_thread()
+            self._queue.put((signature, options, future))
+        return await future
+
+    def _run(self) -> None:
+        stopping = False
+        # Everything queued before _STOP is published before the thread exits
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._publish(batch)
+
+    def _publish(self, batch: List[PublishItem]) -> None:
+        done = 0
+        try:
+            with self.app.producer_or_acquire() as producer:
+                for signature, options, future in batch:
+                    result, error = None, None
+                    try:
+                        result = signature.apply_async(producer=producer, **options)
+                    except Exception as exc:
+                        logger.exception("Task publish failed")
+                        error = exc
+                    future.get_loop().call_soon_threadsafe(
+                        _resolve, future, result, error
+                    )
+                    done += 1
+        except Exception as exc:
+            logger.exception("Broker connection failed")
+            for _, _, future in batch[done:]:
+                future.get_loop().call_soon_threadsafe(_resolve, future, None, exc)
+
+
+publisher = AsyncPublisher(
+    load_celery_app, batch_size=settings.CELERY_PUBLISH_BATCH_SIZE
+)
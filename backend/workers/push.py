@@ -0,0 +1,204 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence, Set
+
+import httpx
+from jose import jwt
+
+from service.core import settings
+
+logger = logging.getLogger(__name__)
+
+FCM_SCOPE = "https://www.googleapis.com/auth/firebase.messaging"
+# FCM answers with this error for tokens that will never be valid again
+INVALID_TOKEN_ERRORS = frozenset({"UNREGISTERED"})
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass
+class SendResult:
+    sent: int = 0
+    failed: int = 0
+    invalid_tokens: Set[str] = field(default_factory=set)
+
+    def merge(self, other: "SendResult") -> None:
+        self.sent += other.sent
+        self.failed += other.failed
+        self.invalid_tokens |= other.invalid_tokens
+
+
+class ServiceAccountToken:
+    """OAuth2 access token of a Google service account.
+    The token is fetched with a signed JWT assertion and reused until
+    a minute before it expires, concurrent callers share one refresh"""
+
+    def __init__(self, info: Dict[str, str], scope: str = FCM_SCOPE):
+        self.info = info
+        self.scope = scope
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._token = None
+
+    def _assertion(self) -> str:
+        now = int(time.time())
+        return jwt.encode(
+            {
+                "iss": self.info["client_email"],
+                "scope": self.scope,
+                "aud": self.info["token_uri"],
+                "iat": now,
+                "exp": now + 3600,
+            },
+            self.info["private_key"],
+            algorithm="RS256",
+        )
+
+    async def get(self, client: httpx.AsyncClient) -> str:
+        async with self._lock:
+            if self._token is None or time.monotonic() > self._expires_at:
+                response = await client.post(
+                    self.info["token_uri"],
+                    data={
+                        "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",
+                        "assertion": self._assertion(),
+                    },
+                )
+                response.raise_for_status()
+                body = response.json()
+                self._token = body["access_token"]
+                self._expires_at = time.monotonic() + body["expires_in"] - 60
+            return self._token
+
+
+def error_code(response: httpx.Response) -> Optional[str]:
+    """FCM error code of a failed send, None when the body has none"""
+    try:
+        for detail in response.json()["error"].get("details", []):
+            if "errorCode" in detail:
+                return detail["errorCode"]
+    except (ValueError, KeyError, TypeError, AttributeError):
+        pass
+    return None
+
+
+class FcmClient:
+    """Sends messages over the FCM HTTP v1 API, one request per token,
+    through one pooled HTTP client. At most `concurrency` requests are
+    in flight, failed requests are retried with exponential backoff"""
+
+    def __init__(
+        self,
+        url: str,
+        credentials: Dict[str, str],
+        concurrency: int,
+        max_retries: int,
+        retry_backoff: float,
+        timeout: float,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.url = f"{url}/v1/projects/{credentials['project_id']}/messages:send"
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._token = ServiceAccountToken(credentials)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=concurrency, max_keepalive_connections=concurrency
+            ),
+            timeout=timeout,
+            transport=transport,
+        )
+
+    async def __aenter__(self) -> "FcmClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._client.aclose()
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        # Full jitter, so retries of parallel sends don't arrive together
+        return random.uniform(0, self.retry_backoff * 2**attempt)
+
+    async def _post(self, payload: Dict[str, Any]) -> Optional[httpx.Response]:
+        """Post with retries, None once the request has failed for good"""
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                async with self._semaphore:
+                    access_token = await self._token.get(self._client)
+                    response = await self._client.post(
+                        self.url,
+                        json=payload,
+                        headers={"Authorization": f"Bearer {access_token}"},
+                    )
+            except httpx.TransportError as exc:
+                logger.warning(f"FCM request failed: {exc!r}")
+            else:
+                if response.status_code == 401:
+                    # Token revoked or expired early, fetch a new one
+                    self._token.invalidate()
+                elif response.status_code not in RETRY_STATUS_CODES:
+                    return response
+                logger.warning(f"FCM responded with {response.status_code}")
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._delay(attempt, response))
+        return None
+
+    async def _send_one(self, token: str, message: Dict[str, Any]) -> SendResult:
+        response = await self._post({"message": {**message, "token": token}})
+        if response is not None and response.status_code == 200:
+            return SendResult(sent=1)
+        if response is not None and error_code(response) in INVALID_TOKEN_ERRORS:
+            return SendResult(invalid_tokens={token})
+        if response is not None:
+            logger.error(f"FCM rejected message: {response.status_code}")
+        return SendResult(failed=1)
+
+    async def send_each(
+        self, tokens: Sequence[str], message: Dict[str, Any]
+    ) -> SendResult:
+        """Send `message` to every token, requests run concurrently
+        up to the client's concurrency"""
+        result = SendResult()
+        for token_result in await asyncio.gather(
+            *(self._send_one(token, message) for token in tokens)
+        ):
+            result.merge(token_result)
+        return result
+
+
+def load_credentials(path: str) -> Dict[str, str]:
+    """Service account key file downloaded from the Firebase console"""
+    with open(path) as credentials:
+        return json.load(credentials)
+
+
+def fcm_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> FcmClient:
+    return FcmClient(
+        url=settings.FCM_URL,
+        credentials=load_credentials(settings.FCM_CREDENTIALS_FILE),
+        concurrency=settings.FCM_CONCURRENCY,
+        max_retries=settings.FCM_MAX_RETRIES,
+        retry_backoff=settings.FCM_RETRY_BACKOFF,
+        timeout=settings.FCM_TIMEOUT,
+        transport=transport,
+    )
+
+
+def notification_message(
+    title: str, body: str, data: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    message: Dict[str, Any] = {"notification": {"title": title, "body": body}}
+    if data:
+        message["data"] = data
+    return message